@@ -10,9 +10,7 @@ class AutomationsConfig(AppConfig):
         """
         Import signal handlers and perform other app initialization
         """
-        # Import signals here if you have any
-        # import automations.signals
-        pass
+        import automations.signals  # noqa: F401
 
 
 
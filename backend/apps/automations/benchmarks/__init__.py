@@ -0,0 +1,21 @@
+"""
+Benchmarks for the reporting and assignment engines.
+
+Run through the `benchmark` management command; each suite module exposes
+`run(sizes, write)` and prints its own timings.
+"""
+import time
+
+
+def timed(func, *args, repeat=3, **kwargs):
+    """Run `func` `repeat` times and return (best wall time in ms, last result)."""
+    best = None
+    result = None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, result
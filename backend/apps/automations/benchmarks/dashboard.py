@@ -0,0 +1,78 @@
+import random
+from collections import defaultdict
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
+from models import Clients
+from services.reports import contract_statistics
+from benchmarks import timed
+
+DEFAULT_SIZES = [10_000, 100_000]
+
+
+def _legacy_contract_statistics(today):
+    """Per-row Python loop the admin dashboard used before aggregation."""
+    monthly_counts = defaultdict(int)
+    counts = defaultdict(int)
+
+    for client in Clients.objects.all():
+        start_date = client.contract_start_date
+        end_date = client.contract_end_date
+
+        if start_date:
+            monthly_counts[start_date.strftime("%b %Y")] += 1
+
+        if client.is_prospect:
+            counts["prospect"] += 1
+        elif end_date:
+            if end_date < today:
+                counts["expired"] += 1
+            else:
+                counts["active"] += 1
+                if end_date <= today + timedelta(days=30):
+                    counts["renewal"] += 1
+
+    return counts, monthly_counts
+
+
+def _seed_clients(count, today):
+    rng = random.Random(count)
+    clients = []
+
+    for i in range(count):
+        start = today - timedelta(days=rng.randint(0, 1500))
+        end = start + timedelta(days=rng.choice([180, 365, 730]))
+        clients.append(Clients(
+            contract_id=f"BENCH-{i}",
+            company_name=f"Bench Client {i}",
+            region=rng.choice(["Nairobi", "Coast", "Western", "Eastern"]),
+            branch_asoc=f"Route {i % 50}",
+            site_id=str(i),
+            premise_location="Bench",
+            frequency=rng.choice(["weekly", "bi-weekly", "monthly"]),
+            quantity=rng.randint(1, 20),
+            contract_start_date=start,
+            contract_end_date=end,
+            services_required="sanitary_bins",
+            is_prospect=rng.random() < 0.05,
+        ))
+
+    Clients.objects.bulk_create(clients, batch_size=5000)
+
+
+def run(sizes, write):
+    """Time dashboard contract statistics with `size` synthetic clients added to the table."""
+    today = timezone.localdate()
+
+    for size in sizes or DEFAULT_SIZES:
+        # Seed inside a transaction that is always rolled back
+        with transaction.atomic():
+            _seed_clients(size, today)
+
+            aggregated_ms, _ = timed(contract_statistics, today)
+            legacy_ms, _ = timed(_legacy_contract_statistics, today, repeat=1)
+
+            write(f"dashboard  clients={size:>7}  aggregated={aggregated_ms:9.1f} ms  "
+                  f"python loop={legacy_ms:9.1f} ms")
+
+            transaction.set_rollback(True)
@@ -0,0 +1,62 @@
+import random
+from datetime import date, datetime, timedelta
+from utils import date_helper
+from utils.date_helper import parse_date, parse_dates
+from benchmarks import timed
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DISTINCT_DATES = 2000
+# (label, strftime format, share of values)
+COLUMN_MIXES = {
+    'iso': (('%Y-%m-%d', 1.0),),
+    'day_first': (('%d/%m/%Y', 1.0),),
+    'month_first': (('%m/%d/%Y', 1.0),),
+    'mixed': (('%Y-%m-%d', 0.5), ('%d/%m/%Y', 0.3), ('%d-%m-%Y', 0.2)),
+}
+
+
+def _legacy_parse_date(date_input, default=None):
+    """parse_date as it was: every format tried in turn through strptime."""
+    if not date_input:
+        return default
+
+    if isinstance(date_input, date):
+        return date_input
+
+    if isinstance(date_input, datetime):
+        return date_input.date()
+
+    for fmt in ["%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%Y/%m/%d", "%d-%m-%Y"]:
+        try:
+            return datetime.strptime(str(date_input).strip(), fmt).date()
+        except ValueError:
+            continue
+
+    return default
+
+
+def _synthetic_column(size, mix, rng):
+    start = date(2015, 1, 1)
+    dates = [start + timedelta(days=rng.randrange(4000)) for _ in range(DISTINCT_DATES)]
+    formats = [fmt for fmt, _ in mix]
+    weights = [share for _, share in mix]
+    return [rng.choice(dates).strftime(rng.choices(formats, weights)[0]) for _ in range(size)]
+
+
+def run(sizes, write):
+    """Compare the legacy parser with the fast path, the per-source format memo and the batch API."""
+    for size in sizes or DEFAULT_SIZES:
+        for mix_name, mix in COLUMN_MIXES.items():
+            column = _synthetic_column(size, mix, random.Random(size))
+            source = ('benchmark', mix_name)
+            date_helper._last_format_by_source.pop(source, None)
+
+            legacy_ms, expected = timed(lambda: [_legacy_parse_date(value) for value in column])
+            scalar_ms, scalar = timed(lambda: [parse_date(value) for value in column])
+            memo_ms, _ = timed(lambda: [parse_date(value, source=source) for value in column])
+            batch_ms, batch = timed(parse_dates, column)
+
+            matches = scalar == expected and batch == expected
+            write(f"date_parsing  values={size:>7}  {mix_name:<11}  legacy={legacy_ms:9.1f} ms  "
+                  f"parse_date={scalar_ms:9.1f} ms  with source={memo_ms:9.1f} ms  "
+                  f"parse_dates={batch_ms:9.1f} ms  {'same results' if matches else 'RESULTS DIFFER'}")
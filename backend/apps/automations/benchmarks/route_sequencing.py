@@ -0,0 +1,33 @@
+import random
+from services.route_sequencing import distance_matrix, nearest_neighbour, tour_length, two_opt
+from benchmarks import timed
+
+DEFAULT_SIZES = [50, 100, 200, 500]
+# Stops scattered over roughly 30 km around the Nairobi CBD
+CENTRE = (-1.2864, 36.8172)
+SPREAD_DEGREES = 0.15
+
+
+def _synthetic_stops(size, rng):
+    return [
+        (CENTRE[0] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES),
+         CENTRE[1] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES))
+        for _ in range(size)
+    ]
+
+
+def run(sizes, write):
+    """Compare tour length and runtime of nearest-neighbour with and without 2-opt."""
+    for size in sizes or DEFAULT_SIZES:
+        rng = random.Random(size)
+        matrix = distance_matrix(_synthetic_stops(size, rng))
+        unordered_km = tour_length(list(range(size)), matrix)
+
+        nn_ms, nn_tour = timed(nearest_neighbour, matrix)
+        opt_ms, opt_tour = timed(two_opt, nn_tour, matrix, repeat=1)
+        nn_km = tour_length(nn_tour, matrix)
+        opt_km = tour_length(opt_tour, matrix)
+
+        write(f"route_sequencing  stops={size:>4}  unordered={unordered_km:8.1f} km  "
+              f"nearest-neighbour={nn_km:7.1f} km ({nn_ms:8.2f} ms)  "
+              f"+2-opt={opt_km:7.1f} km ({nn_ms + opt_ms:9.2f} ms)")
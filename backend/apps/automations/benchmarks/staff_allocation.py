@@ -0,0 +1,81 @@
+import random
+from statistics import pstdev
+from services.auto_tasks.snapshot import AssignmentSnapshot, ClientRecord, StaffRecord
+from services.auto_tasks.staff_allocator import client_bins, get_allocator
+from benchmarks import timed
+
+DEFAULT_SIZES = [1000, 5000, 20000]
+REGIONS = ['eastern', 'coast', 'western', 'north western', 'nairobi']
+SUB_REGIONS_PER_REGION = 40
+SERVICE_BITS = 6
+MAX_BINS = 25
+SEED = 7
+
+
+def _random_mask(rng, low, high):
+    mask = 0
+    for bit in rng.sample(range(SERVICE_BITS), rng.randint(low, high)):
+        mask |= 1 << bit
+    return mask
+
+
+def _synthetic_snapshot(size, rng):
+    clients = []
+    for i in range(size):
+        region = rng.choice(REGIONS)
+        clients.append(ClientRecord(
+            f"client-{i:05d}", region, f"route-{i % 97}",
+            f"{region}-sub-{rng.randrange(SUB_REGIONS_PER_REGION)}",
+            service_mask=_random_mask(rng, 1, 2), quantity=rng.randint(1, 8), is_due=True
+        ))
+
+    # Enough staff for roughly 85% utilisation
+    total_bins = sum(client_bins(client) for client in clients)
+    staff = []
+    for i in range(int(total_bins / (MAX_BINS * 0.85)) + 1):
+        regions = rng.sample(REGIONS, 2 if rng.random() < 0.1 else 1)
+        staff.append(StaffRecord(
+            f"staff-{i:05d}", regions, _random_mask(rng, 2, 4),
+            can_handle_all_services=rng.random() < 0.15
+        ))
+
+    return AssignmentSnapshot(None, staff, clients)
+
+
+def _load_balance(snapshot, allocation):
+    loads = [allocation.workloads.get(staff.username, 0) for staff in snapshot.staff]
+    clients = snapshot.clients_by_name
+    staff = snapshot.staff_by_name
+
+    sub_regions = [
+        len({clients[name].sub_region for name in names})
+        for names in allocation.assignments.values() if names
+    ]
+    cross_region = sum(
+        1 for username, names in allocation.assignments.items()
+        for name in names if clients[name].region != staff[username].regions[0]
+    )
+    return {
+        'stdev': pstdev(loads),
+        'max': max(loads),
+        'sub_regions': sum(sub_regions) / len(sub_regions) if sub_regions else 0,
+        'cross_region': cross_region,
+    }
+
+
+def run(sizes, write):
+    """Compare runtime, coverage and load balance of the allocation engines on synthetic days."""
+    for size in sizes or DEFAULT_SIZES:
+        snapshot = _synthetic_snapshot(size, random.Random(size))
+
+        for name in ('heuristic', 'flow'):
+            elapsed_ms, allocation = timed(
+                get_allocator(name, seed=SEED).allocate, snapshot, MAX_BINS, REGIONS, repeat=1
+            )
+            balance = _load_balance(snapshot, allocation)
+            assigned = size - len(allocation.unassigned)
+
+            write(f"staff_allocation  clients={size:>6}  {name:<9}  assigned={assigned / size:6.1%}  "
+                  f"load stdev={balance['stdev']:5.2f}  max={balance['max']:>3}  "
+                  f"sub-regions/staff={balance['sub_regions']:4.2f}  cross-region={balance['cross_region']:>5}  "
+                  f"{elapsed_ms:10.1f} ms")
@@ -0,0 +1,83 @@
+import random
+from services.vehicle_teams import TeamCandidate, get_team_selector
+from benchmarks import timed
+
+DEFAULT_SIZES = [8, 12, 16, 50, 200]
+SERVICES = ['sanitary_bins', 'hand_dryers', 'air_fresheners', 'urinal_mats', 'sanitizers', 'fumigation']
+SUB_REGIONS = 30
+
+
+def _service_bits(required_services):
+    """Map each required service to a bit."""
+    return {service: 1 << i for i, service in enumerate(sorted(required_services))}
+
+
+def _service_mask(services, bits):
+    """Bitmask of the required services found in `services`."""
+    mask = 0
+    for service in services:
+        mask |= bits.get(service, 0)
+    return mask
+
+
+def _synthetic_fleet(size, rng):
+    fleet = []
+    for i in range(size):
+        can_handle_all = rng.random() < 0.05
+        specs = set(rng.sample(SERVICES, rng.randint(1, 3)))
+        fleet.append((f"KB{i:03d}", can_handle_all, specs, rng.randint(20, 80)))
+    return fleet
+
+
+def _synthetic_sub_regions(rng):
+    return [
+        (set(rng.sample(SERVICES, rng.randint(1, 4))), rng.randint(5, 60))
+        for _ in range(SUB_REGIONS)
+    ]
+
+
+def _assign_region(selector, fleet, sub_regions):
+    """Assign every sub-region in demand order, consuming vehicle capacity."""
+    capacity_left = {name: capacity for name, _, _, capacity in fleet}
+    used = set()
+    team_sizes = 0
+    unassigned = 0
+
+    for required, demand in sorted(sub_regions, key=lambda sr: sr[1], reverse=True):
+        bits = _service_bits(required)
+        full_mask = _service_mask(required, bits)
+        candidates = [
+            TeamCandidate(name, full_mask if can_handle_all else _service_mask(specs, bits), capacity_left[name])
+            for name, can_handle_all, specs, _ in fleet
+        ]
+
+        team = selector.select(candidates, full_mask, demand)
+        if not team:
+            unassigned += 1
+            continue
+
+        remaining = demand
+        for vehicle in sorted(team, key=lambda c: c.capacity, reverse=True):
+            taken = min(remaining, capacity_left[vehicle.name])
+            capacity_left[vehicle.name] -= taken
+            remaining -= taken
+            used.add(vehicle.name)
+
+        team_sizes += len(team)
+
+    return len(used), team_sizes, unassigned
+
+
+def run(sizes, write):
+    """Compare fleet usage and runtime of the team selectors on synthetic fleets."""
+    for size in sizes or DEFAULT_SIZES:
+        rng = random.Random(size)
+        fleet = _synthetic_fleet(size, rng)
+        sub_regions = _synthetic_sub_regions(rng)
+
+        for name in ('greedy', 'exact'):
+            elapsed_ms, (vehicles_used, team_sizes, unassigned) = timed(
+                _assign_region, get_team_selector(name), fleet, sub_regions
+            )
+            write(f"vehicle_teams  fleet={size:>4}  {name:<6}  vehicles used={vehicles_used:>4}  "
+                  f"team slots={team_sizes:>4}  unassigned={unassigned:>3}  {elapsed_ms:9.2f} ms")
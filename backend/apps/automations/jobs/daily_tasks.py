@@ -1,7 +1,11 @@
-from django.db import transaction
+from datetime import datetime, timedelta
 from services.auto_tasks.assigner import AutoTaskAssigner
+from services.auto_tasks.sharding import run_sharded_autotask
+from services.auto_tasks.lookahead import LookaheadPlanner, planned_allocation, planned_moves, store_plan
 from services.schedule import routes
 from services.vehicle import vehicle_enroute
+from services.dashboard import refresh_dashboard_snapshots
+from jobs.pipeline import run_pipeline
 from services.task_managers import (
     filter_task,
     supervisor_data,
@@ -10,17 +14,96 @@ from services.task_managers import (
 )
 
 
-@transaction.atomic
-def run_autotask_job():
+AUTOTASK_JOB = 'autotask'
+
+
+def _service_date():
+    return datetime.today().date() + timedelta(days=1)
+
+
+def _allocate_staff(allocation_engine=None):
+    """Fetch tomorrow's inputs and allocate staff, storing the result as that day's plan."""
+    service_date = _service_date()
+    assigner = AutoTaskAssigner(service_date=service_date, allocation_engine=allocation_engine)
+    if assigner.prepare():
+        store_plan(service_date, assigner.allocation_result())
+
+
+def _persist_assignments():
+    """Write tomorrow's stored plan to Task, Workload and StaffAssignmentResult."""
+    service_date = _service_date()
+    allocation = planned_allocation(service_date)
+    if allocation is None:
+        print(f"No plan stored for {service_date}. Nothing to persist.")
+        return
+
+    AutoTaskAssigner(
+        service_date=service_date, allocation=allocation, pulled_forward=planned_moves(service_date)
+    ).run()
+
+
+def _assign_tasks_by_region(allocation_engine=None):
+    result = run_sharded_autotask(allocation_engine=allocation_engine)
+    if result['failed_regions']:
+        raise RuntimeError(f"Regions failed: {', '.join(sorted(result['failed_regions']))}")
+
+
+def _plan_horizon(lookahead_days, allocation_engine=None):
+    planner = LookaheadPlanner(days=lookahead_days, allocation_engine=allocation_engine, seed=0)
+    planner.run()
+
+
+def autotask_stages(parallel=False, allocation_engine=None, lookahead_days=None):
+    """Ordered (stage, callable) pairs of the daily job."""
+    if lookahead_days:
+        assignment = [
+            ('plan_horizon', lambda: _plan_horizon(lookahead_days, allocation_engine)),
+            ('persist_assignments', _persist_assignments),
+        ]
+    elif parallel:
+        # Each region worker commits its own short write transaction
+        assignment = [('assign_tasks', lambda: _assign_tasks_by_region(allocation_engine))]
+    else:
+        # Fetching and allocating only read; persisting is the one short write
+        assignment = [
+            ('allocate_staff', lambda: _allocate_staff(allocation_engine)),
+            ('persist_assignments', _persist_assignments),
+        ]
+
+    return assignment + [
+        ('unassigned_clients', pre_calculate_unassigned_clients),
+        ('filter_tasks', filter_task),
+        ('vehicles', vehicle_enroute),
+        ('schedules', lambda: routes(incremental=True)),
+        ('dashboard', refresh_dashboard_snapshots),
+        # ('notifications', supervisor_data),  # Uncomment when ready
+    ]
+
+
+# Stages that open their own transactions, or only read before idempotent writes
+NON_ATOMIC_STAGES = {'assign_tasks', 'allocate_staff', 'plan_horizon'}
+
+
+def run_autotask_job(parallel=False, restart=False, allocation_engine=None, lookahead_days=None):
     """
     Main scheduled job for daily task assignment.
     Runs all auto-assignment processes in sequence.
+
+    Every stage commits on its own and leaves a PipelineCheckpoint, so
+    running the job again the same day resumes at the first unfinished
+    stage; `restart=True` runs every stage again. Staff are allocated and
+    stored as tomorrow's plan in one stage and persisted in the next, so the
+    write transaction covers only the persisting. With `parallel=True`
+    regions are assigned concurrently, each in its own transaction.
+    `allocation_engine` picks a staff allocation engine for this run.
+
+    With `lookahead_days`, the next days are planned first (see
+    services.auto_tasks.lookahead) and tomorrow's assignment is taken from
+    that plan; `parallel` then has no effect.
     """
     print("Starting the auto-task assignment process...\n")
 
-    assigner = AutoTaskAssigner()
-    assigner.run()
+    stages = autotask_stages(parallel, allocation_engine, lookahead_days)
+    atomic_stages = {stage for stage, _ in stages} - NON_ATOMIC_STAGES
 
-    pre_calculate_unassigned_clients()
-    filter_task()
-    # supervisor_data()  # Uncomment when ready
+    return run_pipeline(AUTOTASK_JOB, stages, restart=restart, atomic_stages=atomic_stages)
@@ -0,0 +1,77 @@
+"""
+Checkpointed job pipelines.
+
+A pipeline is an ordered list of (stage name, callable). Each stage runs in
+its own transaction together with its PipelineCheckpoint row, so a stage's
+work and its "completed" mark commit or roll back as one. Re-running a
+pipeline on the same run date skips completed stages and resumes at the
+first stage that has not completed.
+"""
+import traceback
+from django.db import transaction
+from django.utils import timezone
+from models import PipelineCheckpoint
+
+
+def completed_stages(job_name, run_date):
+    return set(
+        PipelineCheckpoint.objects.filter(
+            job_name=job_name, run_date=run_date, status="completed"
+        ).values_list("stage", flat=True)
+    )
+
+
+def _record(job_name, run_date, stage, status, started_at, error=""):
+    PipelineCheckpoint.objects.update_or_create(
+        job_name=job_name,
+        run_date=run_date,
+        stage=stage,
+        defaults={
+            "status": status,
+            "error": error,
+            "started_at": started_at,
+            "finished_at": timezone.now(),
+        },
+    )
+
+
+def run_pipeline(job_name, stages, run_date=None, restart=False, atomic_stages=None):
+    """
+    Run `stages` in order, resuming after the last completed stage.
+
+    `atomic_stages` names the stages that run inside the checkpoint's
+    transaction (default: all); stages that manage their own transactions are
+    checkpointed once they return. A failing stage is recorded as failed and
+    stops the pipeline. Returns True when every stage has completed.
+    """
+    run_date = run_date or timezone.localdate()
+
+    if restart:
+        PipelineCheckpoint.objects.filter(job_name=job_name, run_date=run_date).delete()
+
+    done = completed_stages(job_name, run_date)
+
+    for stage, func in stages:
+        if stage in done:
+            print(f"[{job_name}] {stage}: already completed, skipping")
+            continue
+
+        print(f"[{job_name}] {stage}: running")
+        started_at = timezone.now()
+
+        try:
+            if atomic_stages is None or stage in atomic_stages:
+                with transaction.atomic():
+                    func()
+                    _record(job_name, run_date, stage, "completed", started_at)
+            else:
+                func()
+                _record(job_name, run_date, stage, "completed", started_at)
+
+        except Exception as e:
+            traceback.print_exc()
+            _record(job_name, run_date, stage, "failed", started_at, error=str(e))
+            print(f"[{job_name}] {stage}: failed, re-run to resume from here")
+            return False
+
+    return True
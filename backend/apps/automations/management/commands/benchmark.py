@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+from benchmarks import dashboard, date_parsing, route_sequencing, staff_allocation, vehicle_teams
+
+SUITES = {
+    'dashboard': dashboard.run,
+    'vehicle_teams': vehicle_teams.run,
+    'route_sequencing': route_sequencing.run,
+    'staff_allocation': staff_allocation.run,
+    'date_parsing': date_parsing.run,
+}
+
+
+class Command(BaseCommand):
+    help = "Run performance benchmarks on synthetic data (database changes are rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('suite', choices=sorted(SUITES), help="Benchmark suite to run")
+        parser.add_argument('--sizes', type=int, nargs='+', help="Problem sizes to benchmark")
+
+    def handle(self, *args, **options):
+        runner = SUITES.get(options['suite'])
+        if runner is None:
+            raise CommandError(f"Unknown suite: {options['suite']}")
+
+        runner(options['sizes'], self.stdout.write)
@@ -0,0 +1,72 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from models import Task, Clients, WeeklySchedule, VehicleRoute, Workload, Notification
+
+
+def hot_queries():
+    """The lookups views/ and services/ run on every request or nightly job."""
+    today = timezone.localdate()
+
+    return [
+        ("Task by staff and status",
+         Task.objects.filter(staff_assigned="probe", status="Completed")),
+        ("Task by client and due date",
+         Task.objects.filter(client_assigned="probe", due_date__gte=today)),
+        ("WeeklySchedule by client and date",
+         WeeklySchedule.objects.filter(client_name="probe", date_to_service=today)),
+        ("WeeklySchedule by region and date window",
+         WeeklySchedule.objects.filter(region="probe", date_to_service__gte=today)),
+        ("VehicleRoute by plate and date",
+         VehicleRoute.objects.filter(plate="probe", date_assigned__gte=today)),
+        ("Workload by date",
+         Workload.objects.filter(date_assigned=today)),
+        ("Clients by company name",
+         Clients.objects.filter(company_name="probe")),
+        ("Clients by contract id",
+         Clients.objects.filter(contract_id="probe")),
+        ("Notifications for staff, newest first",
+         Notification.objects.filter(staff_assigned="probe").order_by("-created_at")),
+    ]
+
+
+def _full_scans(plan):
+    """Yield tables the plan reads with a full scan, or without using any index."""
+    if isinstance(plan, dict):
+        table = plan.get("table")
+        if isinstance(table, dict) and (
+            table.get("access_type") == "ALL"
+            or (table.get("access_type") != "system" and not table.get("key"))
+        ):
+            yield table.get("table_name")
+        for value in plan.values():
+            yield from _full_scans(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from _full_scans(value)
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the hot queries and fail if any falls back to a full table scan. "
+        "Run against production-sized data: on near-empty tables MySQL may prefer a scan."
+    )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "mysql":
+            raise CommandError(f"Query plan checks need MySQL; the default database is {connection.vendor}.")
+
+        failures = []
+        for label, queryset in hot_queries():
+            plan = json.loads(queryset.explain(format="json"))
+            scans = list(_full_scans(plan))
+
+            if scans:
+                failures.append(label)
+                self.stdout.write(self.style.ERROR(f"FULL SCAN  {label} ({', '.join(scans)})"))
+            else:
+                self.stdout.write(f"ok         {label}")
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot query(ies) fall back to a full table scan.")
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max
+from models import WeeklySchedule, VehicleRoute
+
+# (model, fields of its unique constraint)
+UNIQUE_KEYS = [
+    (WeeklySchedule, ['client_name', 'date_to_service']),
+    (VehicleRoute, ['client', 'date_assigned']),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Collapse duplicate rows that would block the unique constraints on WeeklySchedule "
+        "(client_name, date_to_service) and VehicleRoute (client, date_assigned), keeping the "
+        "newest row of each group. Run after normalise_dates and before applying the migration "
+        "that adds the constraints; it is safe to re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help="Duplicate groups per transaction")
+        parser.add_argument('--dry-run', action='store_true', help="Report without deleting")
+
+    def handle(self, *args, **options):
+        total = 0
+
+        for model, fields in UNIQUE_KEYS:
+            groups, deleted = self._dedupe_model(model, fields, options)
+            total += deleted
+
+            verb = "would be deleted" if options['dry_run'] else "deleted"
+            self.stdout.write(f"{model.__name__}: {groups} duplicate group(s), {deleted} row(s) {verb}")
+
+        if options['dry_run'] and total:
+            self.stdout.write(self.style.WARNING(f"{total} duplicate row(s) must go before migrating."))
+        else:
+            self.stdout.write(self.style.SUCCESS("No duplicates block the unique constraints."))
+
+    def _dedupe_model(self, model, fields, options):
+        groups = list(
+            model.objects.order_by().values(*fields)
+            .annotate(rows=Count('id'), keep_id=Max('id'))
+            .filter(rows__gt=1)
+        )
+
+        deleted = 0
+        for start in range(0, len(groups), options['chunk_size']):
+            with transaction.atomic():
+                for group in groups[start:start + options['chunk_size']]:
+                    duplicates = model.objects.filter(**{field: group[field] for field in fields}).exclude(
+                        id=group['keep_id']
+                    )
+                    if options['dry_run']:
+                        deleted += group['rows'] - 1
+                    else:
+                        deleted += duplicates.delete()[0]
+
+        return len(groups), deleted
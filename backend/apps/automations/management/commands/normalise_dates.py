@@ -0,0 +1,126 @@
+import re
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from models import (
+    Task, Clients, WeeklySchedule, VehicleRoute, Workload,
+    StaffAssignmentResult, TODOReassignments, UnassignedClients,
+    Notification, ToSendToStaff, ClientNotification, ClientToNotify,
+    StaffToNotify, SupervisorNotify
+)
+from utils.date_helper import parse_date
+
+ISO_DATE_PATTERN = r'^[0-9]{4}-[0-9]{2}-[0-9]{2}$'
+ISO_DATE_RE = re.compile(ISO_DATE_PATTERN)
+
+DATE_COLUMNS = [
+    (Task, ['due_date', 'last_service_date', 'revised_date']),
+    (Clients, ['contract_start_date', 'contract_end_date']),
+    (WeeklySchedule, ['date_to_service']),
+    (VehicleRoute, ['date_assigned']),
+    (Workload, ['date_assigned']),
+    (StaffAssignmentResult, ['date_assigned']),
+    (TODOReassignments, ['reassigned_date']),
+    (UnassignedClients, ['target_date']),
+    (Notification, ['due_date']),
+    (ToSendToStaff, ['service_date']),
+    (ClientNotification, ['next_service_date', 'reminder_date']),
+    (ClientToNotify, ['next_service_date', 'reminder_date']),
+    (StaffToNotify, ['reminder_date']),
+    (SupervisorNotify, ['date_sent']),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Rewrite text date columns to ISO YYYY-MM-DD so they can be migrated to DATE. "
+        "Blank values become NULL where the column allows it. "
+        "Run before applying the DateField migration; it is safe to re-run and resumes "
+        "where it stopped, since ISO values are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help="Rows per transaction")
+        parser.add_argument('--model', help="Only normalise this model (e.g. Task)")
+        parser.add_argument('--start-pk', type=int, default=0, help="Resume after this primary key")
+        parser.add_argument('--dry-run', action='store_true', help="Report without writing")
+
+    def handle(self, *args, **options):
+        invalid_total = 0
+        blank_total = 0
+
+        for model, fields in DATE_COLUMNS:
+            if options['model'] and model.__name__ != options['model']:
+                continue
+
+            updated, invalid, blank = self._normalise_model(model, fields, options)
+            invalid_total += len(invalid)
+            blank_total += len(blank)
+
+            self.stdout.write(
+                f"{model.__name__}: {updated} row(s) normalised, {len(invalid)} unparseable, "
+                f"{len(blank)} blank in non-null columns"
+            )
+            for pk, field, value in invalid:
+                self.stdout.write(f"  pk={pk} {field}={value!r}")
+            for pk, field in blank:
+                self.stdout.write(f"  pk={pk} {field} is blank")
+
+        if invalid_total:
+            self.stdout.write(self.style.WARNING(
+                f"{invalid_total} value(s) could not be parsed; fix them before migrating."
+            ))
+        if blank_total:
+            self.stdout.write(self.style.WARNING(
+                f"{blank_total} blank value(s) in columns that cannot be NULL; fill them before migrating."
+            ))
+        if not invalid_total and not blank_total:
+            self.stdout.write(self.style.SUCCESS("All date columns are ISO formatted."))
+
+    def _normalise_model(self, model, fields, options):
+        # Only rows holding at least one non-ISO value need work
+        pending = Q()
+        for field in fields:
+            pending |= Q(**{f'{field}__isnull': False}) & ~Q(**{f'{field}__regex': ISO_DATE_PATTERN})
+
+        queryset = model.objects.filter(pending).order_by('pk')
+        nullable = {field: model._meta.get_field(field).null for field in fields}
+        last_pk = options['start_pk']
+        updated = 0
+        invalid = []
+        blank = []
+
+        while True:
+            rows = list(queryset.filter(pk__gt=last_pk).values('pk', *fields)[:options['chunk_size']])
+            if not rows:
+                break
+
+            with transaction.atomic():
+                for row in rows:
+                    changes = {}
+                    for field in fields:
+                        value = row[field]
+                        if value is None or ISO_DATE_RE.match(str(value)):
+                            continue
+
+                        if not str(value).strip():
+                            if nullable[field]:
+                                changes[field] = None
+                            else:
+                                blank.append((row['pk'], field))
+                            continue
+
+                        parsed = parse_date(value, source=(model.__name__, field))
+                        if parsed is None:
+                            invalid.append((row['pk'], field, value))
+                        else:
+                            changes[field] = parsed
+
+                    if changes and not options['dry_run']:
+                        model.objects.filter(pk=row['pk']).update(**changes)
+                        updated += 1
+
+            last_pk = rows[-1]['pk']
+            self.stdout.write(f"  {model.__name__}: processed up to pk={last_pk}")
+
+        return updated, invalid, blank
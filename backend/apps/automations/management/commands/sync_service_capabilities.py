@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from models import ServicesOffered
+from services.capabilities import (
+    LEGACY_SERVICE_FIELDS, assign_service_bit, invalidate_service_lookup, sync_capabilities
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Link clients, staff and vehicles to ServicesOffered from their legacy services fields "
+        "and store their capability masks (backfill; saves keep them in sync)"
+    )
+
+    def handle(self, *args, **options):
+        for service in ServicesOffered.objects.filter(bit__isnull=True).order_by('pk'):
+            assign_service_bit(service)
+        invalidate_service_lookup()
+
+        unresolved_rows = 0
+        for model in LEGACY_SERVICE_FIELDS:
+            synced = 0
+            for instance in model.objects.order_by('pk').iterator(chunk_size=500):
+                unresolved = sync_capabilities(instance)
+                synced += 1
+                if unresolved:
+                    unresolved_rows += 1
+                    self.stdout.write(self.style.WARNING(
+                        f"{model.__name__} {instance.pk} ({instance}): unknown service(s) {', '.join(unresolved)}"
+                    ))
+
+            self.stdout.write(f"{model.__name__}: {synced} row(s) synced")
+
+        if unresolved_rows:
+            self.stdout.write(self.style.WARNING(
+                f"{unresolved_rows} row(s) name services missing from ServicesOffered. Add them, or fix "
+                "the names, and run this again; until then such clients only match can-handle-all "
+                "staff and vehicles."
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS("Capability masks are up to date."))
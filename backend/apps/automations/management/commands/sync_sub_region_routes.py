@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from models import SubRegion
+from services.route_index import invalidate_route_index, sync_sub_region_routes
+
+
+class Command(BaseCommand):
+    help = "Split every SubRegion's routes text into SubRegionRoute rows (backfill; saves keep them in sync)"
+
+    def handle(self, *args, **options):
+        total = 0
+        for sub_region in SubRegion.objects.all():
+            total += sync_sub_region_routes(sub_region)
+
+        invalidate_route_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} route(s)."))
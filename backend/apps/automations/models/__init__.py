@@ -1,10 +1,10 @@
 from .users import User, Subcontractors, StaffAssignmentResult, TODOReassignments, UnassignedClients
 from .clients import Clients
-from .tasks import Task, AutotaskSwitch, AutotaskSettings
+from .tasks import Task, AutotaskSwitch, AutotaskSettings, PipelineCheckpoint, LookaheadPlan
 from .vehicles import Vehicles, UnassignedVehicles
-from .schedule import WeeklySchedule, VehicleRoute
-from .location import SharedLocations, SubRegion, SpecialAcess, SubregionAllowedStaff
-from .common import HomeCustomize, Uploads, DashboardItems, RecentActivity, Workload, AuditTrail
+from .schedule import WeeklySchedule, VehicleRoute, ScheduleWatermark
+from .location import SharedLocations, SubRegion, SubRegionRoute, SpecialAcess, SubregionAllowedStaff
+from .common import HomeCustomize, Uploads, DashboardItems, DashboardSnapshot, RecentActivity, Workload, AuditTrail
 from .notifications import (
     Notification, OTPData, NotificationTemplate, ToSendToStaff,
     ClientNotification, ClientToNotify, StaffToNotify, SupervisorNotify
@@ -13,10 +13,10 @@ from .services import Services, ServicesOffered
 
 __all__ = [
     'User', 'Subcontractors', 'StaffAssignmentResult', 'TODOReassignments', 'UnassignedClients',
-    'Clients', 'Task', 'AutotaskSwitch', 'AutotaskSettings',
-    'Vehicles', 'UnassignedVehicles', 'WeeklySchedule', 'VehicleRoute',
-    'SharedLocations', 'SubRegion', 'SpecialAcess', 'SubregionAllowedStaff',
-    'HomeCustomize', 'Uploads', 'DashboardItems', 'RecentActivity', 'Workload', 'AuditTrail',
+    'Clients', 'Task', 'AutotaskSwitch', 'AutotaskSettings', 'PipelineCheckpoint', 'LookaheadPlan',
+    'Vehicles', 'UnassignedVehicles', 'WeeklySchedule', 'VehicleRoute', 'ScheduleWatermark',
+    'SharedLocations', 'SubRegion', 'SubRegionRoute', 'SpecialAcess', 'SubregionAllowedStaff',
+    'HomeCustomize', 'Uploads', 'DashboardItems', 'DashboardSnapshot', 'RecentActivity', 'Workload', 'AuditTrail',
     'Notification', 'OTPData', 'NotificationTemplate', 'ToSendToStaff',
     'ClientNotification', 'ClientToNotify', 'StaffToNotify', 'SupervisorNotify',
     'Services', 'ServicesOffered'
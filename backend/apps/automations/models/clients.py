@@ -1,4 +1,5 @@
 from django.db import models
+from .services import ServicesOffered
 
 
 class Clients(models.Model):
@@ -13,6 +14,8 @@ class Clients(models.Model):
     sub_contractor_alias = models.CharField(max_length=200, null=True, default="")
     site_id = models.CharField(max_length=200)
     premise_location = models.CharField(max_length=200)
+    latitude = models.FloatField(null=True, default=None, help_text="Premise latitude, used to order vehicle stops")
+    longitude = models.FloatField(null=True, default=None, help_text="Premise longitude, used to order vehicle stops")
     jobcard = models.CharField(max_length=200, null=True, default="")
     type_of_bins = models.CharField(max_length=200, null=True, default=None)
     quantity = models.IntegerField(null=True, default=None)
@@ -20,9 +23,12 @@ class Clients(models.Model):
     urinal_mats_quantity = models.IntegerField(null=True, default=None)
     handsanitizers_quantity = models.IntegerField(null=True, default=None)
     frequency = models.CharField(max_length=200)
-    contract_start_date = models.CharField(max_length=200)
-    contract_end_date = models.CharField(max_length=200)
+    contract_start_date = models.DateField()
+    contract_end_date = models.DateField()
     services_required = models.CharField(max_length=200)
+    services = models.ManyToManyField(ServicesOffered, blank=True, related_name="clients")
+    service_mask = models.BigIntegerField(null=True, default=None,
+                                          help_text="OR of the bits of `services`; kept in sync by signals, NULL until synced")
     is_active = models.BooleanField(default=True)
     is_inactive = models.BooleanField(default=False)
     is_prospect = models.BooleanField(default=False)
@@ -35,4 +41,10 @@ class Clients(models.Model):
 
     class Meta:
         verbose_name_plural = "Clients"
-        db_table = "clients"
\ No newline at end of file
+        db_table = "clients"
+        indexes = [
+            models.Index(fields=["company_name"], name="client_company_name_idx"),
+            models.Index(fields=["contract_id"], name="client_contract_id_idx"),
+            models.Index(fields=["region"], name="client_region_idx"),
+            models.Index(fields=["updated_at"], name="client_updated_at_idx"),
+        ]
\ No newline at end of file
@@ -1,5 +1,6 @@
 import datetime
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 
@@ -37,8 +38,23 @@ class DashboardItems(models.Model):
         return self.name
 
 
+class DashboardSnapshot(models.Model):
+    snapshot_date = models.DateField()
+    region = models.CharField(max_length=200, default="", blank=True, help_text="Empty for all regions")
+    data = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    is_stale = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
+    def __str__(self):
+        return f"{self.snapshot_date} - {self.region or 'All regions'}"
 
+    class Meta:
+        verbose_name_plural = "Dashboard Snapshots"
+        db_table = "dashboard_snapshots"
+        constraints = [
+            models.UniqueConstraint(fields=["snapshot_date", "region"], name="unique_dashboard_snapshot"),
+        ]
 
 
 class RecentActivity(models.Model):
@@ -52,10 +68,16 @@ class Workload(models.Model):
     staff_name = models.CharField(max_length=200)
     client_assigned = models.CharField(max_length=200)
     workload_count = models.IntegerField()
-    date_assigned = models.CharField(max_length=200)
+    date_assigned = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["date_assigned"], name="workload_date_idx"),
+            models.Index(fields=["staff_name"], name="workload_staff_idx"),
+        ]
+
 class AuditTrail(models.Model):
     initiator = models.CharField(max_length=200)
     action = models.TextField()
@@ -28,6 +28,26 @@ class SubRegion(models.Model):
         db_table = "sub_regions"
 
 
+class SubRegionRoute(models.Model):
+    sub_region = models.ForeignKey(SubRegion, on_delete=models.CASCADE, related_name="route_entries")
+    route = models.CharField(max_length=200, help_text="Route name, stripped and lower-cased")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.route} → {self.sub_region.sub_region}"
+
+    class Meta:
+        verbose_name_plural = "Sub Region Routes"
+        db_table = "sub_region_routes"
+        indexes = [
+            models.Index(fields=["route"], name="sub_region_route_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["sub_region", "route"], name="unique_sub_region_route"),
+        ]
+
+
 class SpecialAcess(models.Model):
     company_name = models.CharField(max_length=200)
     allowed_staff = models.CharField(max_length=200, default="")
@@ -10,7 +10,7 @@ class Notification(models.Model):
     description = models.CharField(max_length=200, default="")
     status = models.CharField(max_length=200)
     priority = models.CharField(max_length=200)
-    due_date = models.CharField(max_length=200, null=True, default=None)
+    due_date = models.DateField(null=True, default=None)
     time = models.DateTimeField(auto_now_add=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -18,6 +18,11 @@ class Notification(models.Model):
     def __str__(self):
         return self.staff_assigned
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["staff_assigned", "created_at"], name="notification_staff_idx"),
+        ]
+
 class OTPData(models.Model):
     otp = models.IntegerField()
     created_at = models.DateTimeField(auto_now_add=True)
@@ -53,7 +58,7 @@ class NotificationTemplate(models.Model):
 class ToSendToStaff(models.Model):
     staff_assigned = models.CharField(max_length=200)
     vehicle_assigned = models.CharField(max_length=200)
-    service_date = models.CharField(max_length=200)
+    service_date = models.DateField()
     client_assigned = models.CharField(max_length=200)
     route = models.CharField(max_length=200, default="Not Found")
     created_at = models.DateTimeField(auto_now_add=True)
@@ -65,8 +70,8 @@ class ToSendToStaff(models.Model):
 
 class ClientNotification(models.Model):
     company_name = models.CharField(max_length=200)
-    next_service_date = models.CharField(max_length=200)
-    reminder_date = models.CharField(max_length=200)
+    next_service_date = models.DateField()
+    reminder_date = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -75,8 +80,8 @@ class ClientNotification(models.Model):
 
 class ClientToNotify(models.Model):
     company_name = models.CharField(max_length=200)
-    next_service_date = models.CharField(max_length=200)
-    reminder_date = models.CharField(max_length=200)
+    next_service_date = models.DateField()
+    reminder_date = models.DateField()
     status = models.CharField(max_length=200)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -87,7 +92,7 @@ class ClientToNotify(models.Model):
 class StaffToNotify(models.Model):
     staff_assigned = models.CharField(max_length=200)
     client_assigned = models.CharField(max_length=5000)
-    reminder_date = models.CharField(max_length=200)
+    reminder_date = models.DateField()
     status = models.CharField(max_length=200)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -95,6 +100,6 @@ class StaffToNotify(models.Model):
         return self.staff_assigned
 
 class SupervisorNotify(models.Model):
-    date_sent = models.CharField(max_length=200)
+    date_sent = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
\ No newline at end of file
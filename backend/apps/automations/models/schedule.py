@@ -5,19 +5,31 @@ class WeeklySchedule(models.Model):
     weekday_name = models.CharField(max_length=200)
     route = models.CharField(max_length=200)
     client_name = models.CharField(max_length=200)
-    date_to_service = models.CharField(max_length=200)
+    date_to_service = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     def __str__(self):
         return self.region
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["region", "date_to_service"], name="schedule_region_date_idx"),
+        ]
+        constraints = [
+            # Weekday, route and region follow from the client and date.
+            # Run `manage.py dedupe_unique_rows` before migrating existing data.
+            models.UniqueConstraint(fields=["client_name", "date_to_service"], name="unique_client_service_date"),
+        ]
+
 
 class VehicleRoute(models.Model):
     plate = models.CharField(max_length=200)
     route = models.CharField(max_length=200)
     client = models.CharField(max_length=200)
     region = models.CharField(max_length=200)
-    date_assigned = models.CharField(max_length=200)
+    date_assigned = models.DateField()
+    stop_sequence = models.PositiveIntegerField(null=True, default=None,
+                                                help_text="Visit order of this client on the vehicle's route that day")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -27,3 +39,23 @@ class VehicleRoute(models.Model):
     class Meta:
         verbose_name_plural = "Vehicle Routes"
         db_table = "vehicle_routes"
+        indexes = [
+            models.Index(fields=["plate", "date_assigned"], name="route_plate_date_idx"),
+        ]
+        constraints = [
+            # Run `manage.py dedupe_unique_rows` before migrating existing data
+            models.UniqueConstraint(fields=["client", "date_assigned"], name="unique_route_client_date"),
+        ]
+
+
+class ScheduleWatermark(models.Model):
+    last_synced_at = models.DateTimeField(null=True, default=None,
+                                          help_text="Task/client changes after this are rescheduled on the next run")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return str(self.last_synced_at)
+
+    class Meta:
+        db_table = "schedule_watermark"
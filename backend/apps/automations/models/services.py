@@ -13,5 +13,7 @@ class Services(models.Model):
 class ServicesOffered(models.Model):
     name = models.CharField(max_length=200)
     alias = models.CharField(max_length=200)
+    bit = models.PositiveSmallIntegerField(null=True, default=None, unique=True,
+                                           help_text="Position of this service in capability masks; assigned on save")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
\ No newline at end of file
@@ -1,4 +1,5 @@
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
 
 
 class Task(models.Model):
@@ -15,15 +16,22 @@ class Task(models.Model):
     comment = models.CharField(max_length=200, default="")
     status = models.CharField(max_length=200, default="")
     priority = models.CharField(max_length=200, default="")
-    last_service_date = models.CharField(max_length=200)
-    due_date = models.CharField(max_length=200, null=True, default="")
-    revised_date = models.CharField(max_length=200, null=True, default=None)
+    last_service_date = models.DateField(null=True, default=None)
+    due_date = models.DateField(null=True, default=None)
+    revised_date = models.DateField(null=True, default=None)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.staff_assigned
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["staff_assigned", "status"], name="task_staff_status_idx"),
+            models.Index(fields=["client_assigned", "due_date"], name="task_client_due_idx"),
+            models.Index(fields=["updated_at"], name="task_updated_at_idx"),
+        ]
+
 
 class AutotaskSwitch(models.Model):
     run_autotask_job = models.BooleanField(default=True)
@@ -34,6 +42,52 @@ class AutotaskSwitch(models.Model):
         return str(self.run_autotask_job)
 
 
+class PipelineCheckpoint(models.Model):
+    STATUS_CHOICES = [
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+
+    job_name = models.CharField(max_length=100)
+    run_date = models.DateField()
+    stage = models.CharField(max_length=100)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    error = models.TextField(blank=True, default="")
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.job_name} {self.run_date} {self.stage}: {self.status}"
+
+    class Meta:
+        verbose_name_plural = "Pipeline Checkpoints"
+        db_table = "pipeline_checkpoints"
+        constraints = [
+            models.UniqueConstraint(fields=["job_name", "run_date", "stage"], name="unique_pipeline_stage_run"),
+        ]
+
+
+class LookaheadPlan(models.Model):
+    service_date = models.DateField(unique=True)
+    input_digest = models.CharField(max_length=64)
+    assignments = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    workloads = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    unassigned = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    vehicle_routes = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    pulled_forward = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Plan for {self.service_date}"
+
+    class Meta:
+        verbose_name_plural = "Lookahead Plans"
+        db_table = "lookahead_plans"
+
+
 class AutotaskSettings(models.Model):
     no_automation_weekday = models.IntegerField(default=5)
     required_staff_in_sub_region_max = models.IntegerField(default=4)
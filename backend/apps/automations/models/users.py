@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from .services import ServicesOffered
 
 class User(AbstractUser):
     updated_at = models.DateTimeField(auto_now=True)
@@ -17,6 +18,9 @@ class User(AbstractUser):
     bio = models.CharField(max_length=200, default="", blank=True)
     service_specializations = models.JSONField(default=list, blank=True,
                                                help_text="List of services.py this staff can handle")
+    services = models.ManyToManyField(ServicesOffered, blank=True, related_name="staff")
+    service_mask = models.BigIntegerField(null=True, default=None,
+                                          help_text="OR of the bits of `services`; kept in sync by signals, NULL until synced")
     can_handle_all_services = models.BooleanField(default=False, help_text="If True, staff can handle any service type")
     can_handle_all_subregions = models.BooleanField(default=False)
 
@@ -33,7 +37,7 @@ class StaffAssignmentResult(models.Model):
     sub_region = models.CharField(max_length=200)
     number_of_clients_assigned = models.IntegerField()
     clients_assigned = models.TextField()
-    date_assigned = models.CharField(max_length=200)
+    date_assigned = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -41,13 +45,13 @@ class StaffAssignmentResult(models.Model):
 class TODOReassignments(models.Model):
     staff_assigned = models.CharField(max_length=200)
     client_assigned = models.CharField(max_length=200)
-    reassigned_date = models.CharField(max_length=200)
+    reassigned_date = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
 
 class UnassignedClients(models.Model):
-    target_date = models.CharField(max_length=200)
+    target_date = models.DateField()
     total_scheduled = models.IntegerField()
     total_assigned = models.IntegerField()
     total_unassigned = models.IntegerField()
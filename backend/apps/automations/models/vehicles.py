@@ -1,4 +1,5 @@
 from django.db import models
+from .services import ServicesOffered
 
 class Vehicles(models.Model):
     vehicle_name = models.CharField(null=True, default=None, max_length=200)
@@ -7,6 +8,9 @@ class Vehicles(models.Model):
     is_available = models.BooleanField(default=True)
     service_specializations = models.JSONField(default=list, blank=True,
                                                help_text="List of services.py this vehicle can handle")
+    services = models.ManyToManyField(ServicesOffered, blank=True, related_name="vehicles")
+    service_mask = models.BigIntegerField(null=True, default=None,
+                                          help_text="OR of the bits of `services`; kept in sync by signals, NULL until synced")
     can_handle_all_services = models.BooleanField(default=False,
                                                   help_text="If True, vehicle can handle any service type")
     can_handle_all_subregions = models.BooleanField(default=False)
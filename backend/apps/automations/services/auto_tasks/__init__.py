@@ -1,16 +1 @@
-from .notifications import send_mail, send_sms_staff, send_sms_client
-from .task_manager import assigned_task
-from .data_loaders import loadcontracts, loadstaffdata
-from .scheduling import routes
-from .vehicles import vehicle_enroute
-
-__all__ = [
-    'send_mail',
-    'send_sms_staff',
-    'send_sms_client',
-    'assigned_task',
-    'loadcontracts',
-    'loadstaffdata',
-    'routes',
-    'vehicle_enroute',
-]
+"""Daily auto-task assignment: snapshot loading, staff allocation, sharding and lookahead planning."""
@@ -1,80 +1,249 @@
 from datetime import datetime, timedelta
 from collections import defaultdict
-import random
 from django.db import transaction
 
-from models import (
-    Clients, User, Task, Workload, SubRegion,
-    SharedLocations, StaffAssignmentResult
-)
-from services.task_managers import send_staff_assignment_notification
-from utils.date_helper import get_date_from_string_or_obj, calculate_next_due_date
+from models import Task, Workload, StaffAssignmentResult, AutotaskSettings, AutotaskSwitch
+from services.auto_tasks.snapshot import AssignmentSnapshot, load_assignment_snapshot
+from services.auto_tasks.staff_allocator import Allocation, client_bins, get_allocator
 
 REGION_PRIORITY = ["Eastern", "Coast", "Western", "North Western", "Nairobi"]
 
 
+def max_bins_setting():
+    """Most bins one staff member services in a day, from AutotaskSettings."""
+    settings = AutotaskSettings.objects.first()
+    return settings.max_num_bins if settings else AutotaskSettings._meta.get_field('max_num_bins').default
+
+
 class AutoTaskAssigner:
     """
     Main class for automated task assignment.
     Handles staff allocation, client distribution, and workload balancing.
+
+    `regions` limits a run to a shard of REGION_PRIORITY and `pinned_staff`
+    ({username: region}) fixes where multi-region staff may work, so shards
+    can run side by side (see services.auto_tasks.sharding).
+
+    All inputs are read once into `snapshot` (see services.auto_tasks.snapshot);
+    pass one in to run the assignment without touching the database for reads.
+
+    `allocation_engine` ('heuristic', the default, or 'flow', see
+    services.auto_tasks.staff_allocator) allocates staff to the due clients;
+    `seed` makes its tie-breaks reproducible. A ready
+    `allocation`, such as a stored lookahead plan (see
+    services.auto_tasks.lookahead), is applied as-is instead; its
+    `pulled_forward` clients ({client: due date}) have their task moved to
+    the service date when they are persisted, so they are not due again.
+
+    Clients and staff outside the run's regions or pins are dropped from the
+    snapshot, from the allocation and from what is persisted.
     """
 
-    def __init__(self):
+    def __init__(self, regions=None, pinned_staff=None, snapshot=None, allocation_engine=None, seed=None,
+                 service_date=None, allocation=None, pulled_forward=None):
         self.today_date = datetime.today().date()
-        self.service_date_target = self.today_date + timedelta(days=1)
+        self.service_date_target = service_date or self.today_date + timedelta(days=1)
 
-        # Data containers
-        self.clients_to_be_assigned = []
-        self.unassigned_clients_log = []
+        # Sharding
+        self.regions = {region.strip().lower() for region in regions} if regions else None
+        self.pinned_staff = pinned_staff or {}
 
-        # Organizational structures
-        self.region_sub_region_to_locations_due = defaultdict(
-            lambda: defaultdict(lambda: defaultdict(list))
-        )
-        self.region_to_staff = defaultdict(list)
-        self.staff_to_regions = defaultdict(list)
-        self.staff_workloads = defaultdict(int)
-        self.final_assignments = defaultdict(list)
+        # Assignment inputs, loaded in one pass
+        self.snapshot = snapshot
+        self.allocator = get_allocator(allocation_engine, seed)
+        self.allocation = allocation
+        self.pulled_forward = pulled_forward or {}
 
-        # Staff management
-        self.staff_sub_region_assignments = {}
-        self.multi_region_staff = set()
-        self.staff_specializations = {}
-        self.staff_in_pools = set()
-        self.region_to_considered_staff = defaultdict(set)
+        # Results
+        self.final_assignments = defaultdict(list)
+        self.staff_workloads = defaultdict(int)
+        self.unassigned_clients_log = []
 
-        # Access control
-        self.special_access_rules = defaultdict(set)
-        self.special_access_clients = defaultdict(set)
-        self.subregion_allowed_staff = defaultdict(list)
-        self.all_subregion_restricted_staff = set()
+    def run(self):
+        """Main execution method; errors propagate so callers can record the failure."""
+        if self.prepare():
+            self.persist()
 
-        # Location management
-        self.client_name_to_location = {}
-        self.staff_location_group_lock = {}
+    def prepare(self):
+        """
+        Fetch the inputs and allocate staff, reading only; False if there is nothing to assign.
 
-    def run(self):
-        """Main execution method."""
+        Nothing is locked or written, so this can run outside any transaction.
+        """
         print(f"--- Running Autotask on {self.today_date} for services due on {self.service_date_target} ---")
 
         try:
             if not self._perform_pre_checks():
-                return
-
-            self._fetch_and_filter_due_clients()
-            self._prepare_special_access_data()
-            self._load_specialization_data()
-            self._load_subregion_staff_rules()
-            self._identify_special_clients_from_rules()
-            self._group_clients_by_location()
-            self._prepare_staff_data()
-            self._process_assignments()
+                return False
+
+            self._load_snapshot()
+            self._allocate_staff()
+            return True
+
+        except Exception as e:
+            print(f"CRITICAL ERROR in AutoTaskAssigner: {e}")
+            import traceback
+            traceback.print_exc()
+            raise
+
+    def persist(self):
+        """Write the prepared assignment in one short transaction."""
+        try:
+            with transaction.atomic():
+                self._persist_assignments()
             self._generate_report()
-            self._run_post_processes()
 
         except Exception as e:
             print(f"CRITICAL ERROR in AutoTaskAssigner: {e}")
             import traceback
             traceback.print_exc()
+            raise
+
+    def _perform_pre_checks(self):
+        """False when the job is switched off or the service date is the no-automation weekday."""
+        switch = AutotaskSwitch.objects.first()
+        if switch is not None and not switch.run_autotask_job:
+            print("Autotask is switched off. Skipping assignment.")
+            return False
+
+        settings = AutotaskSettings.objects.first()
+        skip_weekday = (settings.no_automation_weekday if settings
+                        else AutotaskSettings._meta.get_field('no_automation_weekday').default)
+        if self.service_date_target.weekday() == skip_weekday:
+            print(f"No automation on {self.service_date_target:%A}s. Skipping assignment.")
+            return False
+
+        return True
+
+    def _load_snapshot(self):
+        """Read every assignment input in a fixed number of queries, unless one was given."""
+        if self.snapshot is None:
+            self.snapshot = load_assignment_snapshot(self.service_date_target, self.regions, self.pinned_staff)
+
+        # A snapshot passed in may cover more than this shard
+        self.snapshot = AssignmentSnapshot(
+            self.snapshot.service_date,
+            [staff for staff in self.snapshot.staff
+             if any(self._region_in_scope(region) and self._staff_in_scope(staff.username, region)
+                    for region in staff.regions)],
+            [client for client in self.snapshot.clients if self._region_in_scope(client.region)],
+            self.snapshot.special_access, self.snapshot.subregion_allowed_staff, self.snapshot.shared_locations
+        )
+
+        print(f"Snapshot: {len(self.snapshot.staff)} staff, {len(self.snapshot.clients)} clients")
+
+    def _allocate_staff(self):
+        """Allocate the snapshot's due clients with the selected engine, or apply the given allocation."""
+        if self.allocation is not None:
+            allocation, source = self.allocation, 'planned'
+        else:
+            allocation = self.allocator.allocate(self.snapshot, max_bins_setting(), REGION_PRIORITY)
+            source = self.allocator.name
+
+        assigned, dropped = set(), []
+        for staff, clients in allocation.assignments.items():
+            for client in clients:
+                if self._assignment_in_scope(staff, client):
+                    self.final_assignments[staff].append(client)
+                    self.staff_workloads[staff] += client_bins(self.snapshot.clients_by_name[client])
+                    assigned.add(client)
+                elif client in self.snapshot.clients_by_name:
+                    # This run's client, but the staff member is not available to it
+                    print(f"WARNING: {client} cannot go to {staff} in this run")
+                    dropped.append(client)
+
+        # Clients of other regions belong to other runs
+        self.unassigned_clients_log.extend(
+            client for client in list(allocation.unassigned) + dropped
+            if client in self.snapshot.clients_by_name and client not in assigned
+        )
+
+        print(f"{source} allocation: {len(self.final_assignments)} staff, "
+              f"{len(self.unassigned_clients_log)} client(s) unassigned")
+
+    def _persist_assignments(self):
+        """Write this run's Task, Workload and StaffAssignmentResult rows, for in-scope clients only."""
+        service_date = self.service_date_target
+        assigned = {client for clients in self.final_assignments.values() for client in clients}
+
+        # Commit the plan's moves: an assigned client is served now, not on its old due date
+        moved = [client for client in self.pulled_forward if client in assigned]
+        for client in moved:
+            Task.objects.filter(client_assigned=client, due_date=self.pulled_forward[client]).update(
+                due_date=service_date
+            )
+
+        run_clients = [client.name for client in self.snapshot.clients if client.is_due] + moved
+        run_staff = [staff.username for staff in self.snapshot.staff]
+
+        # Re-running a day replaces only this run's rows
+        Workload.objects.filter(date_assigned=service_date, client_assigned__in=run_clients).delete()
+        StaffAssignmentResult.objects.filter(date_assigned=service_date, staff_name__in=run_staff).delete()
+
+        workloads, results = [], []
+        for staff, clients in self.final_assignments.items():
+            outside = [client for client in clients if not self._assignment_in_scope(staff, client)]
+            if outside:
+                raise ValueError(f"Refusing to persist assignments outside this run: {staff} -> {', '.join(outside)}")
+
+            Task.objects.filter(client_assigned__in=clients, due_date=service_date).update(
+                staff_assigned=staff, status='Pending'
+            )
+
+            by_sub_region = defaultdict(list)
+            for client in clients:
+                record = self.snapshot.clients_by_name[client]
+                workloads.append(Workload(
+                    staff_name=staff, client_assigned=client,
+                    workload_count=client_bins(record), date_assigned=service_date
+                ))
+                by_sub_region[record.sub_region].append(client)
+
+            for sub_region, sub_region_clients in by_sub_region.items():
+                results.append(StaffAssignmentResult(
+                    staff_name=staff, sub_region=sub_region,
+                    number_of_clients_assigned=len(sub_region_clients),
+                    clients_assigned=', '.join(sub_region_clients), date_assigned=service_date
+                ))
+
+        Workload.objects.bulk_create(workloads, batch_size=1000)
+        StaffAssignmentResult.objects.bulk_create(results, batch_size=1000)
+
+    def _generate_report(self):
+        assigned = sum(len(clients) for clients in self.final_assignments.values())
+        print(f"Assigned {assigned} client(s) to {len(self.final_assignments)} staff, "
+              f"{len(self.unassigned_clients_log)} unassigned")
+
+    def _region_in_scope(self, region):
+        """True if this run handles `region`."""
+        return self.regions is None or (region or '').strip().lower() in self.regions
+
+    def _staff_in_scope(self, username, region):
+        """True if `username` may work in `region` during this run."""
+        pinned_region = self.pinned_staff.get(username)
+        return pinned_region is None or pinned_region == (region or '').strip().lower()
+
+    def _assignment_in_scope(self, username, client_name):
+        """True if this run may assign `client_name` to `username`."""
+        client = self.snapshot.clients_by_name.get(client_name)
+        return (
+            client is not None and username in self.snapshot.staff_by_name
+            and self._region_in_scope(client.region) and self._staff_in_scope(username, client.region)
+        )
+
+    def allocation_result(self):
+        """This run's assignment as an Allocation, for storing as a plan."""
+        allocation = Allocation()
+        for staff, clients in self.final_assignments.items():
+            allocation.assignments[staff].extend(clients)
+        allocation.workloads.update(self.staff_workloads)
+        allocation.unassigned.extend(self.unassigned_clients_log)
+        return allocation
 
-    # ... (rest of the methods from your original class)
+    def shard_result(self):
+        """Picklable summary of this run, merged by the sharded runner."""
+        return {
+            'assignments': {staff: list(clients) for staff, clients in self.final_assignments.items()},
+            'workloads': dict(self.staff_workloads),
+            'unassigned': list(self.unassigned_clients_log),
+        }
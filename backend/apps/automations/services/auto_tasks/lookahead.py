@@ -0,0 +1,262 @@
+"""
+Rolling-horizon planning of staff and vehicle assignments.
+
+LookaheadPlanner plans the next `days` service dates at once instead of
+tomorrow alone, skipping AutotaskSettings.no_automation_weekday:
+
+1. One snapshot load covers the whole horizon.
+2. Peaks are levelled: when a region's due bins on a day exceed its staff
+   capacity, clients are pulled forward by up to `flex_days` onto earlier
+   days with room. Clients are never moved later than their due date.
+3. Each day is allocated and, optionally, given vehicles in a dry run. The
+   result is stored as a LookaheadPlan with a digest of that day's inputs.
+
+A pulled-forward client's task keeps its due date until the plan for the
+earlier day is persisted (see AutoTaskAssigner), which moves it there.
+
+On the next night the horizon rolls forward by a day. Days whose digest is
+unchanged keep their stored plan, so only the newly visible day and days
+whose inputs changed are planned again.
+"""
+import hashlib
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from models import AutotaskSettings, LookaheadPlan, Vehicles
+from services.auto_tasks.assigner import REGION_PRIORITY
+from services.auto_tasks.snapshot import AssignmentSnapshot, ClientRecord, load_assignment_snapshots
+from services.auto_tasks.staff_allocator import Allocation, client_bins, get_allocator
+from services.vehicle import VehicleAssigner
+
+DEFAULT_HORIZON_DAYS = 7
+DEFAULT_FLEX_DAYS = 1
+
+
+def planning_dates(start_date, days, skip_weekday=None):
+    """The next `days` service dates from `start_date`, leaving out `skip_weekday`."""
+    dates = []
+    day = start_date
+    while len(dates) < days:
+        if day.weekday() != skip_weekday:
+            dates.append(day)
+        day += timedelta(days=1)
+    return dates
+
+
+def _region_capacity(snapshot, max_bins):
+    """Bins each region's home staff can service on the snapshot's day."""
+    capacity = defaultdict(int)
+    for staff in snapshot.staff:
+        if staff.regions:
+            capacity[staff.regions[0]] += max_bins
+    return capacity
+
+
+def _with_due(snapshot, due_names):
+    """Copy of `snapshot` with exactly `due_names` due."""
+    clients = [
+        ClientRecord(c.name, c.region, c.route, c.sub_region, c.premise_location,
+                     c.service_mask, c.quantity, c.frequency, c.name in due_names)
+        for c in snapshot.clients
+    ]
+    return AssignmentSnapshot(
+        snapshot.service_date, snapshot.staff, clients, snapshot.special_access,
+        snapshot.subregion_allowed_staff, snapshot.shared_locations
+    )
+
+
+def level_due_clients(snapshots, max_bins, flex_days=DEFAULT_FLEX_DAYS):
+    """
+    Pull clients forward from overloaded days; returns (snapshots, moves).
+
+    `snapshots` is {date: AssignmentSnapshot}. A client moves to the latest
+    earlier day, at most `flex_days` before its due date, whose region still
+    has room for its bins. Largest clients move first. `moves` is a list of
+    (client, due date, planned date).
+    """
+    dates = sorted(snapshots)
+    due = {day: {c.name for c in snapshots[day].clients if c.is_due} for day in dates}
+    capacity = {day: _region_capacity(snapshots[day], max_bins) for day in dates}
+    load = {day: defaultdict(int) for day in dates}
+    for day in dates:
+        for client in snapshots[day].clients:
+            if client.is_due:
+                load[day][client.region] += client_bins(client)
+
+    moves = []
+    for index, day in enumerate(dates):
+        earlier = [d for d in reversed(dates[:index]) if d >= day - timedelta(days=flex_days)]
+        if not earlier:
+            continue
+
+        for region in sorted(load[day]):
+            excess = load[day][region] - capacity[day][region]
+            if excess <= 0:
+                continue
+
+            candidates = sorted(
+                (c for c in snapshots[day].clients if c.is_due and c.region == region),
+                key=lambda c: (-client_bins(c), c.name)
+            )
+            for client in candidates:
+                if excess <= 0:
+                    break
+
+                bins = client_bins(client)
+                target = next((
+                    d for d in earlier
+                    if client.name in snapshots[d].clients_by_name and client.name not in due[d]
+                    and load[d][region] + bins <= capacity[d][region]
+                ), None)
+                if target is None:
+                    continue
+
+                due[day].discard(client.name)
+                due[target].add(client.name)
+                load[day][region] -= bins
+                load[target][region] += bins
+                excess -= bins
+                moves.append((client.name, day, target))
+
+    changed = {day for _, due_date, planned in moves for day in (due_date, planned)}
+    levelled = {
+        day: _with_due(snapshots[day], due[day]) if day in changed else snapshots[day]
+        for day in dates
+    }
+    return levelled, moves
+
+
+def snapshot_digest(snapshot, *parts):
+    """Digest of everything an allocation of `snapshot` depends on, plus `parts`."""
+    staff = sorted(
+        (s.username, s.regions, s.service_mask, s.can_handle_all_services,
+         s.can_handle_all_subregions, s.has_special_access, s.is_emergency)
+        for s in snapshot.staff
+    )
+    clients = sorted(
+        (c.name, c.region, c.route, c.sub_region, c.service_mask, c.quantity)
+        for c in snapshot.clients if c.is_due
+    )
+    rules = (
+        sorted((client, sorted(staff)) for client, staff in snapshot.special_access.items()),
+        sorted((sub_region, sorted(staff)) for sub_region, staff in snapshot.subregion_allowed_staff.items()),
+        sorted(snapshot.shared_locations.items()),
+    )
+    return hashlib.sha256(repr((staff, clients, rules, parts)).encode()).hexdigest()
+
+
+def fleet_digest():
+    """Digest of the vehicle fleet, so vehicle plans are redone when it changes."""
+    fleet = Vehicles.objects.order_by('id').values_list(
+        'vehicle_name', 'capacity', 'region', 'is_available', 'service_mask',
+        'can_handle_all_services', 'can_handle_all_subregions'
+    )
+    return hashlib.sha256(repr(list(fleet)).encode()).hexdigest()
+
+
+def store_plan(service_date, allocation, input_digest='', vehicle_routes=None, pulled_forward=()):
+    """Save `allocation` as the plan for `service_date`, replacing any stored one."""
+    LookaheadPlan.objects.update_or_create(
+        service_date=service_date,
+        defaults={
+            'input_digest': input_digest,
+            'assignments': dict(allocation.assignments),
+            'workloads': dict(allocation.workloads),
+            'unassigned': allocation.unassigned,
+            'vehicle_routes': vehicle_routes or {},
+            'pulled_forward': list(pulled_forward),
+        }
+    )
+
+
+def planned_allocation(service_date):
+    """The stored plan for `service_date` as an Allocation, or None."""
+    plan = LookaheadPlan.objects.filter(service_date=service_date).first()
+    if plan is None:
+        return None
+
+    allocation = Allocation()
+    for staff, clients in plan.assignments.items():
+        allocation.assignments[staff].extend(clients)
+    allocation.workloads.update(plan.workloads)
+    allocation.unassigned.extend(plan.unassigned)
+    return allocation
+
+
+def planned_moves(service_date):
+    """{client: original due date} for clients the plan for `service_date` pulled forward."""
+    plan = LookaheadPlan.objects.filter(service_date=service_date).first()
+    if plan is None:
+        return {}
+    return {client: date.fromisoformat(due_date) for client, due_date in plan.pulled_forward}
+
+
+class LookaheadPlanner:
+    """Plan the next `days` service dates, replanning only days whose inputs changed."""
+
+    def __init__(self, days=DEFAULT_HORIZON_DAYS, start_date=None, allocation_engine=None, seed=0,
+                 flex_days=DEFAULT_FLEX_DAYS, include_vehicles=True, team_strategy='greedy'):
+        self.days = days
+        self.start_date = start_date or datetime.today().date() + timedelta(days=1)
+        self.allocator = get_allocator(allocation_engine, seed)
+        self.seed = seed
+        self.flex_days = flex_days
+        self.include_vehicles = include_vehicles
+        self.team_strategy = team_strategy
+
+    def run(self):
+        settings = AutotaskSettings.objects.first()
+        if settings is None:
+            skip_weekday = AutotaskSettings._meta.get_field('no_automation_weekday').default
+            max_bins = AutotaskSettings._meta.get_field('max_num_bins').default
+        else:
+            skip_weekday = settings.no_automation_weekday
+            max_bins = settings.max_num_bins
+
+        dates = planning_dates(self.start_date, self.days, skip_weekday)
+        print(f"--- Lookahead plan for {dates[0]} to {dates[-1]} ({len(dates)} days) ---")
+
+        snapshots, moves = level_due_clients(load_assignment_snapshots(dates), max_bins, self.flex_days)
+        pulled_forward = defaultdict(list)
+        for client, due_date, planned in moves:
+            pulled_forward[planned].append([client, due_date.isoformat()])
+
+        fleet = (fleet_digest(), self.team_strategy) if self.include_vehicles else None
+        stored = {plan.service_date: plan for plan in LookaheadPlan.objects.filter(service_date__in=dates)}
+
+        replanned, reused = [], []
+        for day in dates:
+            digest = snapshot_digest(snapshots[day], max_bins, self.allocator.name, self.seed, fleet)
+            plan = stored.get(day)
+            if plan is not None and plan.input_digest == digest:
+                reused.append(day)
+                continue
+
+            self._plan_day(day, snapshots[day], max_bins, digest, pulled_forward[day])
+            replanned.append(day)
+
+        # Days that rolled out of the horizon
+        LookaheadPlan.objects.exclude(service_date__in=dates).delete()
+
+        print(f"Planned {len(replanned)} day(s), reused {len(reused)}, "
+              f"pulled {len(moves)} client(s) forward")
+
+        return {
+            'dates': [day.isoformat() for day in dates],
+            'replanned': [day.isoformat() for day in replanned],
+            'reused': [day.isoformat() for day in reused],
+            'pulled_forward': len(moves),
+        }
+
+    def _plan_day(self, day, snapshot, max_bins, digest, pulled_forward):
+        allocation = self.allocator.allocate(snapshot, max_bins, REGION_PRIORITY)
+
+        vehicle_routes = {}
+        if self.include_vehicles:
+            vehicle_assigner = VehicleAssigner(
+                self.team_strategy, service_date=day, dry_run=True,
+                client_names=[client for clients in allocation.assignments.values() for client in clients]
+            )
+            vehicle_assigner.run()
+            vehicle_routes = vehicle_assigner.planned_routes()
+
+        store_plan(day, allocation, digest, vehicle_routes, pulled_forward)
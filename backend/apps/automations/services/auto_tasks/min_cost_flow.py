@@ -0,0 +1,122 @@
+"""
+Min-cost flow by successive shortest paths (primal-dual).
+
+Shortest paths use Dijkstra on reduced costs (Johnson potentials), so edge
+costs must start non-negative. Capacities and costs are integers. Paths are
+short here (source → demand → class → sink), so the recursive push is shallow.
+"""
+from heapq import heappop, heappush
+
+INF = float('inf')
+
+
+class MinCostFlow:
+    def __init__(self, node_count):
+        self.node_count = node_count
+        # graph[u] holds [to, residual capacity, cost, index of the reverse edge in graph[to]]
+        self.graph = [[] for _ in range(node_count)]
+
+    def add_edge(self, u, v, capacity, cost):
+        """Add a directed edge; returns a handle for flow_on()."""
+        self.graph[u].append([v, capacity, cost, len(self.graph[v])])
+        self.graph[v].append([u, 0, -cost, len(self.graph[u]) - 1])
+        return u, len(self.graph[u]) - 1, capacity
+
+    def flow_on(self, handle):
+        u, index, capacity = handle
+        return capacity - self.graph[u][index][1]
+
+    def _shortest_paths(self, source, potential):
+        """Dijkstra on reduced costs; returns distances from `source`."""
+        graph = self.graph
+        dist = [INF] * self.node_count
+        dist[source] = 0
+        heap = [(0, source)]
+
+        while heap:
+            d, u = heappop(heap)
+            if d > dist[u]:
+                continue
+            base = d + potential[u]
+            for v, capacity, edge_cost, _ in graph[u]:
+                if capacity <= 0:
+                    continue
+                nd = base + edge_cost - potential[v]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    heappush(heap, (nd, v))
+
+        return dist
+
+    def _admissible_levels(self, source, sink, potential):
+        """BFS levels over residual edges with zero reduced cost, or None if `sink` is unreachable."""
+        graph = self.graph
+        level = [-1] * self.node_count
+        level[source] = 0
+        queue = [source]
+
+        for u in queue:
+            for v, capacity, edge_cost, _ in graph[u]:
+                if capacity > 0 and level[v] < 0 and edge_cost + potential[u] - potential[v] == 0:
+                    level[v] = level[u] + 1
+                    queue.append(v)
+
+        return level if level[sink] >= 0 else None
+
+    def _push(self, u, sink, limit, level, next_edge, potential):
+        """Push up to `limit` units from `u` to `sink` along admissible level-increasing edges."""
+        if u == sink:
+            return limit
+
+        graph = self.graph
+        edges = graph[u]
+        edge_count = len(edges)
+        while next_edge[u] < edge_count:
+            edge = edges[next_edge[u]]
+            v, capacity, edge_cost, reverse = edge
+            if (capacity > 0 and level[v] == level[u] + 1
+                    and edge_cost + potential[u] - potential[v] == 0):
+                pushed = self._push(v, sink, min(limit, capacity), level, next_edge, potential)
+                if pushed:
+                    edge[1] -= pushed
+                    graph[v][reverse][1] += pushed
+                    return pushed
+            next_edge[u] += 1
+
+        return 0
+
+    def solve(self, source, sink):
+        """
+        Push as much flow as possible at least cost; returns (flow, cost).
+
+        Primal-dual: each Dijkstra pass raises the potentials, then a blocking
+        flow saturates every shortest path of that length at once.
+        """
+        potential = [0] * self.node_count
+        flow = 0
+        cost = 0
+
+        while True:
+            dist = self._shortest_paths(source, potential)
+            if dist[sink] == INF:
+                break
+
+            for node in range(self.node_count):
+                if dist[node] < INF:
+                    potential[node] += dist[node]
+            path_cost = potential[sink] - potential[source]
+
+            while True:
+                level = self._admissible_levels(source, sink, potential)
+                if level is None:
+                    break
+
+                next_edge = [0] * self.node_count
+                while True:
+                    pushed = self._push(source, sink, INF, level, next_edge, potential)
+                    if not pushed:
+                        break
+                    flow += pushed
+                    cost += pushed * path_cost
+
+        return flow, cost
@@ -0,0 +1,149 @@
+"""
+Region-sharded execution of the daily auto-task assignment.
+
+Regions only interact through staff who cover more than one region, so those
+staff are pinned to a single region up front. Each region then runs in its
+own worker process, on its own database connection and in its own short
+transaction, and the per-region results are merged at the end.
+"""
+import multiprocessing
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from django.db import connections
+
+from models import User
+from services.auto_tasks.assigner import AutoTaskAssigner, REGION_PRIORITY
+
+
+def _staff_regions():
+    """{username: [regions]} for active staff, regions lower-cased in listed order."""
+    staff_regions = {}
+    for username, regions in User.objects.filter(
+        is_active=True, is_laidoff=False, is_onleave=False
+    ).values_list('username', 'region'):
+        listed = [region.strip().lower() for region in (regions or '').split(',') if region.strip()]
+        if listed:
+            staff_regions[username] = listed
+    return staff_regions
+
+
+def pin_multi_region_staff(regions):
+    """
+    Pin every multi-region staff member to one of their regions.
+
+    Each goes to the covered region with the fewest staff so far, ties going
+    to the earlier region in `regions`, so no one can be assigned twice by
+    concurrent shards.
+    """
+    regions = [region.strip().lower() for region in regions]
+    staff_regions = _staff_regions()
+
+    headcount = defaultdict(int)
+    for listed in staff_regions.values():
+        if len(listed) == 1:
+            headcount[listed[0]] += 1
+
+    pinned = {}
+    for username, listed in sorted(staff_regions.items()):
+        covered = [region for region in regions if region in listed]
+        if len(listed) < 2 or not covered:
+            continue
+
+        region = min(covered, key=lambda r: (headcount[r], regions.index(r)))
+        pinned[username] = region
+        headcount[region] += 1
+
+    return pinned
+
+
+def _run_region(region, pinned_staff, allocation_engine=None):
+    """Worker: assign one region on its own connection; only the write runs in a transaction."""
+    # Never reuse a connection inherited from the parent process
+    connections.close_all()
+
+    try:
+        assigner = AutoTaskAssigner(regions=[region], pinned_staff=pinned_staff,
+                                    allocation_engine=allocation_engine)
+        assigner.run()
+        return region, assigner.shard_result(), None
+    except Exception as e:
+        return region, None, str(e)
+    finally:
+        connections.close_all()
+
+
+def _priority(region):
+    lowered = [r.lower() for r in REGION_PRIORITY]
+    return lowered.index(region) if region in lowered else len(lowered)
+
+
+def merge_shard_results(results):
+    """
+    Merge per-region results.
+
+    Returns (assignments, workloads, unassigned, conflicts), where conflicts
+    lists (staff, [regions]) for anyone who ended up assigned in more than one
+    region; pinning should keep it empty.
+    """
+    assignments = defaultdict(list)
+    workloads = defaultdict(int)
+    unassigned = []
+    staff_seen_in = defaultdict(list)
+
+    for region, result in sorted(results.items(), key=lambda item: _priority(item[0])):
+        for staff, clients in result['assignments'].items():
+            assignments[staff].extend(clients)
+            if clients:
+                staff_seen_in[staff].append(region)
+        for staff, workload in result['workloads'].items():
+            workloads[staff] += workload
+        unassigned.extend(result['unassigned'])
+
+    conflicts = [(staff, regions) for staff, regions in staff_seen_in.items() if len(regions) > 1]
+    return dict(assignments), dict(workloads), unassigned, conflicts
+
+
+def run_sharded_autotask(regions=None, max_workers=None, allocation_engine=None):
+    """
+    Run the auto-task assignment with one worker process per region.
+
+    Each region commits independently; a failed region is reported and can be
+    re-run on its own with AutoTaskAssigner(regions=[region]).
+    """
+    regions = [region.strip().lower() for region in (regions or REGION_PRIORITY)]
+    pinned_staff = pin_multi_region_staff(regions)
+    max_workers = max_workers or min(len(regions), os.cpu_count() or 1)
+
+    print(f"--- Sharded Autotask: {len(regions)} region(s), {max_workers} worker(s), "
+          f"{len(pinned_staff)} multi-region staff pinned ---")
+
+    # Forked workers must open their own connections
+    connections.close_all()
+
+    results = {}
+    failed = {}
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('fork')) as pool:
+        futures = [pool.submit(_run_region, region, pinned_staff, allocation_engine) for region in regions]
+
+        for future in as_completed(futures):
+            region, result, error = future.result()
+            if error:
+                failed[region] = error
+                print(f"  ✗ {region.title()}: {error}")
+            else:
+                results[region] = result
+                print(f"  ✓ {region.title()}: {len(result['assignments'])} staff assigned")
+
+    assignments, workloads, unassigned, conflicts = merge_shard_results(results)
+
+    for staff, staff_regions in conflicts:
+        print(f"WARNING: {staff} was assigned in several regions: {', '.join(staff_regions)}")
+
+    return {
+        'assignments': assignments,
+        'workloads': workloads,
+        'unassigned': unassigned,
+        'conflicts': conflicts,
+        'failed_regions': failed,
+    }
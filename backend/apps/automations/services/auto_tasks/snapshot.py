@@ -0,0 +1,224 @@
+"""
+In-memory snapshot of everything AutoTaskAssigner reads.
+
+load_assignment_snapshot() fetches staff, clients, due tasks, special access
+rules, sub-region staff rules and shared locations in a fixed number of
+values() queries. The assignment algorithm then works on the snapshot's
+compact records and indexes alone, so it can be benchmarked or tested by
+building an AssignmentSnapshot from plain records, with no database.
+"""
+from collections import defaultdict
+
+
+def _split(text):
+    return tuple(part.strip() for part in (text or '').split(',') if part.strip())
+
+
+def _norm(text):
+    return (text or '').strip().lower()
+
+
+class StaffRecord:
+    __slots__ = ('username', 'regions', 'service_mask', 'can_handle_all_services',
+                 'can_handle_all_subregions', 'has_special_access', 'is_emergency')
+
+    def __init__(self, username, regions, service_mask=0, can_handle_all_services=False,
+                 can_handle_all_subregions=False, has_special_access=False, is_emergency=False):
+        self.username = username
+        self.regions = tuple(regions)
+        self.service_mask = service_mask
+        self.can_handle_all_services = can_handle_all_services
+        self.can_handle_all_subregions = can_handle_all_subregions
+        self.has_special_access = has_special_access
+        self.is_emergency = is_emergency
+
+    def can_serve(self, required_mask):
+        return self.can_handle_all_services or not required_mask & ~self.service_mask
+
+    def __repr__(self):
+        return f"StaffRecord({self.username!r}, {self.regions!r})"
+
+
+class ClientRecord:
+    __slots__ = ('name', 'region', 'route', 'sub_region', 'premise_location',
+                 'service_mask', 'quantity', 'frequency', 'is_due')
+
+    def __init__(self, name, region, route, sub_region, premise_location='',
+                 service_mask=0, quantity=0, frequency='', is_due=False):
+        self.name = name
+        self.region = region
+        self.route = route
+        self.sub_region = sub_region
+        self.premise_location = premise_location
+        self.service_mask = service_mask
+        self.quantity = quantity
+        self.frequency = frequency
+        self.is_due = is_due
+
+    def __repr__(self):
+        return f"ClientRecord({self.name!r}, {self.region!r}, {self.sub_region!r})"
+
+
+class AssignmentSnapshot:
+    """
+    Assignment inputs with the lookups the assigner needs.
+
+    Regions and sub-regions are keyed lower-cased. Rule inputs are plain
+    dicts: special_access {client: set(staff)}, subregion_allowed_staff
+    {sub_region: set(staff)} and shared_locations {(region, sub_region):
+    tuple(locations)}.
+    """
+
+    __slots__ = ('service_date', 'staff', 'clients', 'special_access', 'subregion_allowed_staff',
+                 'shared_locations', 'staff_by_name', 'staff_by_region', 'staff_by_service',
+                 'clients_by_name', 'due_clients_by_sub_region', 'restricted_staff')
+
+    def __init__(self, service_date, staff, clients, special_access=None,
+                 subregion_allowed_staff=None, shared_locations=None):
+        self.service_date = service_date
+        self.staff = list(staff)
+        self.clients = list(clients)
+        self.special_access = special_access or {}
+        self.subregion_allowed_staff = subregion_allowed_staff or {}
+        self.shared_locations = shared_locations or {}
+
+        self.staff_by_name = {record.username: record for record in self.staff}
+        self.staff_by_region = defaultdict(list)
+        self.staff_by_service = defaultdict(list)
+        for record in self.staff:
+            for region in record.regions:
+                self.staff_by_region[region].append(record)
+            mask = record.service_mask
+            while mask:
+                bit = mask & -mask
+                self.staff_by_service[bit].append(record)
+                mask ^= bit
+
+        self.clients_by_name = {record.name: record for record in self.clients}
+        self.due_clients_by_sub_region = defaultdict(list)
+        for record in self.clients:
+            if record.is_due:
+                self.due_clients_by_sub_region[(record.region, record.sub_region)].append(record)
+
+        # Staff named in any sub-region rule may only work where a rule allows them
+        self.restricted_staff = set()
+        for allowed in self.subregion_allowed_staff.values():
+            self.restricted_staff.update(allowed)
+
+    def staff_in_region(self, region):
+        return self.staff_by_region.get(_norm(region), [])
+
+    def staff_for_services(self, required_mask, region=None):
+        """Staff able to serve every service in `required_mask`, optionally within a region."""
+        pool = self.staff_in_region(region) if region is not None else self.staff
+        return [record for record in pool if record.can_serve(required_mask)]
+
+    def due_clients(self, region, sub_region):
+        return self.due_clients_by_sub_region.get((_norm(region), _norm(sub_region)), [])
+
+    def staff_allowed_in_sub_region(self, username, sub_region):
+        """Sub-region rules only restrict staff who are named in at least one rule."""
+        if username not in self.restricted_staff:
+            return True
+        return username in self.subregion_allowed_staff.get(_norm(sub_region), ())
+
+    def special_access_staff(self, client_name):
+        """Staff allowed at a special-access client, or None if the client is unrestricted."""
+        return self.special_access.get(client_name)
+
+    def shared_locations_for(self, region, sub_region):
+        return self.shared_locations.get((_norm(region), _norm(sub_region)), ())
+
+
+def load_assignment_snapshot(service_date, regions=None, pinned_staff=None):
+    """
+    Fetch all assignment inputs for `service_date` in a fixed number of queries.
+
+    With `regions`, only those regions' clients and staff are loaded, and
+    staff pinned ({username: region}) to a region outside them are left out.
+    """
+    return load_assignment_snapshots([service_date], regions, pinned_staff)[service_date]
+
+
+def load_assignment_snapshots(service_dates, regions=None, pinned_staff=None, staff_on_leave=None):
+    """
+    Snapshots for several dates from the same fixed number of queries.
+
+    `staff_on_leave` ({date: usernames}) drops staff from single dates, for
+    what-if runs.
+    """
+    from models import Clients, SharedLocations, SpecialAcess, SubregionAllowedStaff, Task, User
+    from services.capabilities import offered_mask, required_mask
+    from services.route_index import UNMAPPED_SUB_REGION, get_route_index, normalise_route
+
+    service_dates = sorted(set(service_dates))
+    regions = {_norm(region) for region in regions} if regions else None
+    staff_on_leave = staff_on_leave or {}
+    route_index = get_route_index()
+
+    staff = []
+    for row in User.objects.filter(is_active=True, is_laidoff=False, is_onleave=False).values(
+        'username', 'region', 'service_mask', 'can_handle_all_services',
+        'can_handle_all_subregions', 'has_special_access', 'is_emergency'
+    ):
+        staff_regions = tuple(_norm(region) for region in _split(row['region']))
+        pinned_region = (pinned_staff or {}).get(row['username'])
+        if regions is not None and (
+            not regions.intersection(staff_regions)
+            or (pinned_region is not None and pinned_region not in regions)
+        ):
+            continue
+        staff.append(StaffRecord(
+            row['username'], staff_regions, offered_mask(row['service_mask']), row['can_handle_all_services'],
+            row['can_handle_all_subregions'], row['has_special_access'], row['is_emergency']
+        ))
+
+    due_names = defaultdict(set)
+    for client_name, due_date in Task.objects.filter(
+        due_date__range=(service_dates[0], service_dates[-1])
+    ).exclude(client_assigned='').values_list('client_assigned', 'due_date'):
+        due_names[due_date].add(client_name)
+
+    client_rows = []
+    for row in Clients.objects.filter(is_active=True, is_prospect=False).values(
+        'company_name', 'region', 'branch_asoc', 'premise_location',
+        'service_mask', 'quantity', 'frequency'
+    ):
+        region = _norm(row['region'])
+        if regions is not None and region not in regions:
+            continue
+        location = route_index.get(normalise_route(row['branch_asoc']))
+        client_rows.append((
+            row['company_name'], region, row['branch_asoc'],
+            location.sub_region if location else UNMAPPED_SUB_REGION,
+            row['premise_location'], required_mask(row['service_mask']), row['quantity'] or 0, row['frequency']
+        ))
+
+    special_access = defaultdict(set)
+    for company_name, allowed_staff in SpecialAcess.objects.values_list('company_name', 'allowed_staff'):
+        special_access[company_name].update(_split(allowed_staff))
+
+    subregion_allowed_staff = defaultdict(set)
+    for sub_region, allowed_staff in SubregionAllowedStaff.objects.values_list('sub_region', 'allowed_staff'):
+        subregion_allowed_staff[_norm(sub_region)].update(_split(allowed_staff))
+
+    shared_locations = {
+        (_norm(region), _norm(sub_region)): _split(shared_loc)
+        for region, sub_region, shared_loc in SharedLocations.objects.values_list(
+            'region', 'sub_region', 'shared_loc'
+        )
+    }
+
+    snapshots = {}
+    for service_date in service_dates:
+        due_today = due_names.get(service_date, set())
+        on_leave = set(staff_on_leave.get(service_date, ()))
+
+        snapshots[service_date] = AssignmentSnapshot(
+            service_date,
+            [record for record in staff if record.username not in on_leave],
+            [ClientRecord(*row, row[0] in due_today) for row in client_rows],
+            dict(special_access), dict(subregion_allowed_staff), shared_locations
+        )
+
+    return snapshots
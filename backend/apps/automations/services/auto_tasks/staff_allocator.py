@@ -0,0 +1,286 @@
+"""
+Staff allocation engines for AutoTaskAssigner.
+
+Both engines take an AssignmentSnapshot (see services.auto_tasks.snapshot)
+and give every due client to one staff member, never exceeding the
+`max_bins` a staff member can service in a day. They are deterministic for
+a given seed.
+
+- 'heuristic': per sub-region, each client goes to the least-loaded eligible
+  staff member, ties broken by a seeded shuffle.
+- 'flow': per region, a min-cost flow of bins from (sub-region, service mask)
+  demand groups to staff, with costs for travel outside the home region,
+  unneeded specialisation and uneven workloads. The seed orders the edges,
+  which decides between equally cheap allocations.
+"""
+import random
+from collections import defaultdict
+from math import ceil
+from services.auto_tasks.min_cost_flow import MinCostFlow
+
+# Flow costs per bin. Few distinct values keep the number of shortest-path phases low.
+CROSS_REGION_COST = 50
+OVERQUALIFIED_COST = 1
+GENERALIST_COST = 3
+# (share of a staff member's remaining capacity, cost per bin): convex, so load spreads out
+WORKLOAD_TIERS = ((0.2, 0), (0.2, 1), (0.2, 2), (0.2, 4), (0.2, 8))
+
+
+def client_bins(client):
+    """Bins a client adds to a workload; every visit counts as at least one."""
+    return max(client.quantity or 0, 1)
+
+
+class Allocation:
+    __slots__ = ('assignments', 'workloads', 'unassigned')
+
+    def __init__(self):
+        self.assignments = defaultdict(list)
+        self.workloads = defaultdict(int)
+        self.unassigned = []
+
+    def assign(self, staff, client):
+        self.assignments[staff.username].append(client.name)
+        self.workloads[staff.username] += client_bins(client)
+
+
+def _can_take(snapshot, allocation, staff, client, max_bins):
+    """Hard constraints shared by every engine."""
+    return (
+        client.region in staff.regions
+        and staff.can_serve(client.service_mask)
+        and snapshot.staff_allowed_in_sub_region(staff.username, client.sub_region)
+        and allocation.workloads[staff.username] + client_bins(client) <= max_bins
+    )
+
+
+def _due_clients_by_region(snapshot, region_order):
+    by_region = defaultdict(list)
+    for client in sorted(snapshot.clients, key=lambda c: c.name):
+        if client.is_due:
+            by_region[client.region].append(client)
+
+    order = [region.lower() for region in region_order]
+    regions = sorted(by_region, key=lambda r: (order.index(r) if r in order else len(order), r))
+    return [(region, by_region[region]) for region in regions]
+
+
+def _assign_special_access(snapshot, allocation, clients, max_bins):
+    """Give clients with an allowed-staff list to the least-loaded allowed staff; returns the rest."""
+    remaining = []
+    for client in clients:
+        allowed = snapshot.special_access_staff(client.name)
+        if allowed is None:
+            remaining.append(client)
+            continue
+
+        candidates = [
+            snapshot.staff_by_name[username] for username in sorted(allowed)
+            if username in snapshot.staff_by_name
+            and _can_take(snapshot, allocation, snapshot.staff_by_name[username], client, max_bins)
+        ]
+        if candidates:
+            allocation.assign(min(candidates, key=lambda s: allocation.workloads[s.username]), client)
+        else:
+            allocation.unassigned.append(client.name)
+
+    return remaining
+
+
+class HeuristicAllocator:
+    """Least-loaded greedy assignment, one sub-region at a time, largest first. O(clients × staff)."""
+
+    name = 'heuristic'
+
+    def __init__(self, seed=None):
+        self.seed = seed
+
+    def allocate(self, snapshot, max_bins, region_order=()):
+        rng = random.Random(self.seed)
+        allocation = Allocation()
+
+        for region, clients in _due_clients_by_region(snapshot, region_order):
+            clients = _assign_special_access(snapshot, allocation, clients, max_bins)
+            staff_pool = list(snapshot.staff_in_region(region))
+            rng.shuffle(staff_pool)
+            tie_break = {staff.username: i for i, staff in enumerate(staff_pool)}
+
+            by_sub_region = defaultdict(list)
+            for client in clients:
+                by_sub_region[client.sub_region].append(client)
+
+            for sub_region in sorted(by_sub_region, key=lambda sr: (-len(by_sub_region[sr]), sr)):
+                for client in by_sub_region[sub_region]:
+                    candidates = [s for s in staff_pool if _can_take(snapshot, allocation, s, client, max_bins)]
+                    if not candidates:
+                        allocation.unassigned.append(client.name)
+                        continue
+
+                    staff = min(candidates, key=lambda s: (allocation.workloads[s.username], tie_break[s.username]))
+                    allocation.assign(staff, client)
+
+        return allocation
+
+
+class FlowAllocator:
+    """
+    Min-cost flow allocation, solved region by region in priority order.
+
+    Interchangeable staff (same home region, skills, sub-region rules and
+    remaining capacity) are merged into one class node, keeping the graph at
+    (demand groups × staff classes) edges. Each class's flow is then split
+    evenly over its members, and clients are handed out within those
+    allotments. Multi-region staff carry their load into later regions.
+    """
+
+    name = 'flow'
+
+    def __init__(self, seed=None):
+        self.seed = seed
+
+    def allocate(self, snapshot, max_bins, region_order=()):
+        rng = random.Random(self.seed)
+        allocation = Allocation()
+
+        for region, clients in _due_clients_by_region(snapshot, region_order):
+            clients = _assign_special_access(snapshot, allocation, clients, max_bins)
+            self._allocate_region(snapshot, allocation, region, clients, max_bins, rng)
+
+        return allocation
+
+    def _staff_classes(self, snapshot, allocation, region, max_bins):
+        classes = defaultdict(list)
+        for staff in sorted(snapshot.staff_in_region(region), key=lambda s: s.username):
+            remaining = max_bins - allocation.workloads[staff.username]
+            if remaining <= 0:
+                continue
+
+            allowed = None
+            if staff.username in snapshot.restricted_staff:
+                allowed = frozenset(
+                    sub_region for sub_region, names in snapshot.subregion_allowed_staff.items()
+                    if staff.username in names
+                )
+
+            key = (
+                staff.regions[0] == region,
+                None if staff.can_handle_all_services else staff.service_mask,
+                allowed,
+                remaining,
+            )
+            classes[key].append(staff)
+
+        return sorted(classes.items(), key=lambda item: item[1][0].username)
+
+    def _edge_cost(self, home, class_mask, demand_mask):
+        cost = 0 if home else CROSS_REGION_COST
+        if class_mask is None:
+            return cost + GENERALIST_COST
+        return cost + OVERQUALIFIED_COST * bin(class_mask & ~demand_mask).count('1')
+
+    def _allocate_region(self, snapshot, allocation, region, clients, max_bins, rng):
+        demands = defaultdict(list)
+        for client in clients:
+            demands[(client.sub_region, client.service_mask)].append(client)
+        demand_keys = sorted(demands)
+        staff_classes = self._staff_classes(snapshot, allocation, region, max_bins)
+        rng.shuffle(demand_keys)
+        rng.shuffle(staff_classes)
+
+        source, sink = 0, 1
+        demand_node = {key: 2 + i for i, key in enumerate(demand_keys)}
+        class_node_start = 2 + len(demand_keys)
+        network = MinCostFlow(class_node_start + len(staff_classes))
+
+        for key in demand_keys:
+            network.add_edge(source, demand_node[key], sum(client_bins(c) for c in demands[key]), 0)
+
+        edges = []
+        for offset, ((home, class_mask, allowed, remaining), members) in enumerate(staff_classes):
+            node = class_node_start + offset
+
+            for share, cost in WORKLOAD_TIERS:
+                network.add_edge(node, sink, ceil(remaining * share) * len(members), cost)
+
+            for sub_region, demand_mask in demand_keys:
+                if allowed is not None and sub_region not in allowed:
+                    continue
+                if class_mask is not None and demand_mask & ~class_mask:
+                    continue
+
+                handle = network.add_edge(
+                    demand_node[(sub_region, demand_mask)], node, max_bins * len(members),
+                    self._edge_cost(home, class_mask, demand_mask)
+                )
+                edges.append(((sub_region, demand_mask), offset, handle))
+
+        network.solve(source, sink)
+
+        # Split each class's flow evenly over its members, filling one staff member at a time
+        allotments = defaultdict(list)
+        class_flows = defaultdict(list)
+        for key, offset, handle in edges:
+            flow = network.flow_on(handle)
+            if flow:
+                class_flows[offset].append((flow, key))
+
+        for offset, flows in class_flows.items():
+            members = staff_classes[offset][1]
+            share = ceil(sum(flow for flow, _ in flows) / len(members))
+            member_index = 0
+            room = share
+
+            for flow, key in sorted(flows, key=lambda item: (-item[0], item[1])):
+                while flow > 0 and member_index < len(members):
+                    taken = min(flow, room)
+                    allotments[key].append([members[member_index], taken])
+                    flow -= taken
+                    room -= taken
+                    if room == 0:
+                        member_index += 1
+                        room = share
+
+        leftovers = []
+        for key in demand_keys:
+            staff_allotments = allotments.get(key, [])
+
+            for client in sorted(demands[key], key=lambda c: (-client_bins(c), c.name)):
+                candidates = [
+                    entry for entry in staff_allotments
+                    if _can_take(snapshot, allocation, entry[0], client, max_bins)
+                ]
+                if not candidates:
+                    leftovers.append(client)
+                    continue
+
+                entry = max(candidates, key=lambda e: (e[1], -allocation.workloads[e[0].username]))
+                allocation.assign(entry[0], client)
+                entry[1] -= client_bins(client)
+
+        # Clients are indivisible, so some bins do not fit their allotment; place them least-loaded
+        staff_pool = sorted(snapshot.staff_in_region(region), key=lambda s: s.username)
+        for client in leftovers:
+            candidates = [s for s in staff_pool if _can_take(snapshot, allocation, s, client, max_bins)]
+            if candidates:
+                allocation.assign(min(candidates, key=lambda s: allocation.workloads[s.username]), client)
+            else:
+                allocation.unassigned.append(client.name)
+
+
+ALLOCATORS = {
+    HeuristicAllocator.name: HeuristicAllocator,
+    FlowAllocator.name: FlowAllocator,
+}
+
+
+# The nightly job's engine, used wherever no engine is named
+DEFAULT_ALLOCATOR = HeuristicAllocator.name
+
+
+def get_allocator(name=None, seed=None):
+    """Instantiate an allocation engine by name, DEFAULT_ALLOCATOR if none is given."""
+    name = name or DEFAULT_ALLOCATOR
+    try:
+        return ALLOCATORS[name](seed=seed)
+    except KeyError:
+        raise ValueError(f"Unknown allocation engine '{name}'. Choose from: {', '.join(sorted(ALLOCATORS))}")
@@ -0,0 +1,217 @@
+"""
+Service capability masks for clients, staff and vehicles.
+
+Every ServicesOffered row owns one bit. Clients, staff and vehicles link to
+the services they need or provide through `services` many-to-many fields,
+and the OR of those bits is stored on the row as `service_mask`, so a
+compatibility check is `required & ~offered == 0` with no string parsing.
+
+The legacy text fields (Clients.services_required, service_specializations)
+are still what the views write; saving a row re-derives its links from them.
+
+A NULL service_mask means the row has not been synced yet: a client then
+requires every service, so only can-handle-all staff and vehicles match it,
+and a staff member or vehicle offers none. Run sync_service_capabilities
+once after adding the masks; it lists every row that names a service
+matching no ServicesOffered name or alias.
+
+A client naming such a service, or one that has no bit yet, keeps a NULL
+mask, so it is never matched on a partial set of its services. Staff and
+vehicles simply offer the services that do resolve.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from models import Clients, User, Vehicles, ServicesOffered
+from utils.cache_versions import bump_version, current_version
+
+# service_mask is a signed BIGINT
+MAX_SERVICE_BITS = 63
+ALL_SERVICES_MASK = (1 << MAX_SERVICE_BITS) - 1
+
+_SERVICE_LOOKUP_VERSION_KEY = 'service_lookup:version'
+
+# version -> {name or alias: (service pk, bit)}; replaced whenever the version moves on
+_service_lookup_local = {}
+
+# Legacy field each model's service links are derived from
+LEGACY_SERVICE_FIELDS = {
+    Clients: 'services_required',
+    Vehicles: 'service_specializations',
+    User: 'service_specializations',
+}
+
+
+def next_service_bit():
+    """Lowest bit position not held by a ServicesOffered row; freed bits are reused."""
+    used = set(ServicesOffered.objects.filter(bit__isnull=False).values_list('bit', flat=True))
+
+    for bit in range(MAX_SERVICE_BITS):
+        if bit not in used:
+            return bit
+
+    raise ValueError(f"Capability masks hold at most {MAX_SERVICE_BITS} services.")
+
+
+def assign_service_bit(service):
+    """Give `service` the lowest free bit; the unique bit column settles concurrent claims."""
+    for _ in range(MAX_SERVICE_BITS):
+        bit = next_service_bit()
+        try:
+            with transaction.atomic():
+                claimed = ServicesOffered.objects.filter(pk=service.pk, bit__isnull=True).update(bit=bit)
+        except IntegrityError:
+            # Another service took this bit first
+            continue
+
+        if claimed:
+            service.bit = bit
+        return service.bit
+
+    raise ValueError(f"Could not claim a capability bit for service {service.name!r}.")
+
+
+def required_mask(mask):
+    """A client's stored mask; unsynced (NULL) requires every service."""
+    return ALL_SERVICES_MASK if mask is None else mask
+
+
+def offered_mask(mask):
+    """A staff member's or vehicle's stored mask; unsynced (NULL) offers none."""
+    return 0 if mask is None else mask
+
+
+def can_serve(offered_mask, required_mask, can_handle_all=False):
+    """True if `offered_mask` covers every bit of `required_mask`."""
+    return can_handle_all or not required_mask & ~offered_mask
+
+
+def service_names_by_bit():
+    """{single-bit mask: service name} for describing masks in reports."""
+    return {
+        1 << bit: name.strip().lower()
+        for name, bit in ServicesOffered.objects.filter(bit__isnull=False).values_list('name', 'bit')
+    }
+
+
+def describe_mask(mask, names_by_bit):
+    """Sorted service names set in `mask`."""
+    return sorted(name for bit, name in names_by_bit.items() if mask & bit)
+
+
+def legacy_service_names(instance):
+    """Service names held in the instance's legacy text/JSON field."""
+    values = getattr(instance, LEGACY_SERVICE_FIELDS[type(instance)]) or []
+    if isinstance(values, str):
+        values = values.split(',')
+
+    return {str(value).strip().lower() for value in values if str(value).strip()}
+
+
+def _service_lookup():
+    version = current_version(_SERVICE_LOOKUP_VERSION_KEY)
+
+    lookup = _service_lookup_local.get(version)
+    if lookup is not None:
+        return lookup
+
+    lookup = {}
+    for pk, name, alias, bit in ServicesOffered.objects.order_by('pk').values_list('pk', 'name', 'alias', 'bit'):
+        lookup.setdefault(name.strip().lower(), (pk, bit))
+        lookup.setdefault(alias.strip().lower(), (pk, bit))
+
+    _service_lookup_local.clear()
+    _service_lookup_local[version] = lookup
+    return lookup
+
+
+def invalidate_service_lookup():
+    """Drop every cached name → service lookup."""
+    _service_lookup_local.clear()
+    bump_version(_SERVICE_LOOKUP_VERSION_KEY)
+
+
+def resolve_services(names):
+    """
+    (service pks, mask, unresolved names) for `names`, matched by service name or alias.
+
+    Unresolved names match no service, or a service without a bit, so the
+    mask does not cover them.
+    """
+    lookup = _service_lookup()
+    service_ids = set()
+    mask = 0
+    unknown = []
+
+    for name in sorted(names):
+        match = lookup.get(name)
+        if match is None:
+            unknown.append(name)
+            continue
+
+        pk, bit = match
+        service_ids.add(pk)
+        if bit is None:
+            unknown.append(name)
+        else:
+            mask |= 1 << bit
+
+    return service_ids, mask, unknown
+
+
+def _stored_mask(instance, mask, unresolved):
+    """The mask to store: NULL for a client whose required services do not all resolve."""
+    return None if unresolved and isinstance(instance, Clients) else mask
+
+
+def refresh_service_mask(instance):
+    """Recompute and store `service_mask` from the instance's linked services."""
+    mask = 0
+    for bit in instance.services.filter(bit__isnull=False).values_list('bit', flat=True):
+        mask |= 1 << bit
+
+    _, _, unresolved = resolve_services(legacy_service_names(instance))
+    mask = _stored_mask(instance, mask, unresolved)
+
+    type(instance).objects.filter(pk=instance.pk).update(service_mask=mask)
+    instance.service_mask = mask
+    return mask
+
+
+def sync_capabilities(instance):
+    """
+    Link the instance to the services named in its legacy field and store its mask.
+
+    Links are only rewritten when they differ, and the mask is written once,
+    only when it changed. Returns the unresolved names (see resolve_services).
+    """
+    service_ids, mask, unresolved = resolve_services(legacy_service_names(instance))
+    mask = _stored_mask(instance, mask, unresolved)
+
+    if set(instance.services.values_list('pk', flat=True)) != service_ids:
+        # The mask is stored below; skip the per-link refresh in m2m_changed
+        instance._syncing_capabilities = True
+        try:
+            instance.services.set(service_ids)
+        finally:
+            instance._syncing_capabilities = False
+
+    if instance.service_mask != mask:
+        type(instance).objects.filter(pk=instance.pk).update(service_mask=mask)
+        instance.service_mask = mask
+
+    return unresolved
+
+
+def clear_service_bit(service):
+    """Drop a service's bit from every stored mask, before the service is deleted."""
+    if service.bit is None:
+        return
+
+    bit = 1 << service.bit
+    for model in LEGACY_SERVICE_FIELDS:
+        linked = model.objects.filter(services=service)
+        if model is Clients:
+            # Their services no longer all resolve
+            linked.update(service_mask=None)
+        else:
+            linked.update(service_mask=F('service_mask').bitand(~bit))
@@ -0,0 +1,128 @@
+from datetime import timedelta
+from django.db.models import Count
+from django.utils import timezone
+from models import Clients, Task, User, WeeklySchedule, DashboardSnapshot
+from services.reports import contract_statistics
+
+ALL_REGIONS = ""
+UPCOMING_SCHEDULE_DAYS = 7
+
+
+def build_dashboard_stats(today, region=ALL_REGIONS):
+    """Compute the admin dashboard figures for one region (or all of them) from live tables."""
+    clients = Clients.objects.all()
+    schedules = WeeklySchedule.objects.all()
+    tasks = Task.objects.all()
+    staff = User.objects.filter(
+        is_staff=True,
+        is_superuser=False,
+        is_manager=False,
+        is_admin=False,
+        is_supervisor=False,
+    )
+
+    if region:
+        clients = clients.filter(region=region)
+        schedules = schedules.filter(region=region)
+        tasks = tasks.filter(client_assigned__in=clients.values("company_name"))
+        staff = staff.filter(region=region)
+
+    contract_stats = contract_statistics(today, region or None)
+
+    return {
+        # Client statistics
+        "total_contracts": contract_stats["total_contracts"],
+        "active_contracts": contract_stats["active_contracts"],
+        "expired_contracts": contract_stats["expired_contracts"],
+        "prospect_count": contract_stats["prospect_count"],
+        "avg_bins": round(contract_stats["avg_bins"], 1),
+        "renewal_count": contract_stats["renewal_count"],
+        "freq_breakdown": list(clients.values("frequency").annotate(count=Count("id"))),
+        "region_breakdown": list(clients.values("region").annotate(count=Count("id"))),
+        "monthly_data": contract_stats["monthly_data"],
+        # Task and staff
+        "task_count": tasks.count(),
+        "client_count": contract_stats["total_contracts"],
+        "staff_count": staff.count(),
+        # Weekly Schedule
+        "recent_schedules": list(schedules.order_by("-created_at")[:5].values()),
+        "route_breakdown": list(schedules.values("route").annotate(count=Count("id"))),
+        "upcoming_schedules": list(
+            schedules.filter(
+                date_to_service__gte=today,
+                date_to_service__lte=today + timedelta(days=UPCOMING_SCHEDULE_DAYS),
+            )
+            .order_by("date_to_service")
+            .values()
+        ),
+    }
+
+
+def save_dashboard_snapshot(today, region=ALL_REGIONS):
+    """Recompute and store the snapshot for one day and region."""
+    snapshot, _ = DashboardSnapshot.objects.update_or_create(
+        snapshot_date=today,
+        region=region,
+        defaults={
+            "data": build_dashboard_stats(today, region),
+            "is_stale": False,
+        },
+    )
+    return snapshot
+
+
+def get_dashboard_stats(today=None, region=ALL_REGIONS, fresh=False):
+    """
+    Return dashboard figures from today's snapshot.
+
+    A missing or stale snapshot is rebuilt, so a write only costs a recompute
+    of the regions it touched. `fresh=True` bypasses the snapshot entirely.
+    """
+    today = today or timezone.localdate()
+
+    # Unknown regions are answered live rather than creating snapshot rows
+    if fresh or (region and not Clients.objects.filter(region=region).exists()):
+        return build_dashboard_stats(today, region)
+
+    snapshot = (
+        DashboardSnapshot.objects.filter(snapshot_date=today, region=region, is_stale=False)
+        .values_list("data", flat=True)
+        .first()
+    )
+    if snapshot is not None:
+        return snapshot
+
+    return save_dashboard_snapshot(today, region).data
+
+
+def refresh_dashboard_snapshots(today=None):
+    """Rebuild today's snapshot for every region plus the all-regions total."""
+    today = today or timezone.localdate()
+    regions = (
+        Clients.objects.exclude(region="")
+        .order_by()
+        .values_list("region", flat=True)
+        .distinct()
+    )
+
+    save_dashboard_snapshot(today)
+    for region in regions:
+        save_dashboard_snapshot(today, region)
+
+    print(f"Dashboard snapshots refreshed for {today}.")
+
+
+def mark_dashboard_snapshots_stale(*regions):
+    """
+    Flag today's snapshots for recompute on their next read.
+
+    With `regions`, only those regions and the all-regions total are flagged;
+    writes without a region (e.g. tasks) flag every snapshot for today.
+    """
+    snapshots = DashboardSnapshot.objects.filter(snapshot_date=timezone.localdate(), is_stale=False)
+
+    regions = {region for region in regions if region}
+    if regions:
+        snapshots = snapshots.filter(region__in=[ALL_REGIONS, *regions])
+
+    snapshots.update(is_stale=True)
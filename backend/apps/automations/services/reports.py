@@ -0,0 +1,130 @@
+from collections import defaultdict
+from datetime import timedelta
+from django.db.models import Avg, Count, Q
+from django.db.models.functions import TruncMonth
+from models import Clients, Task, Workload, VehicleRoute
+
+RENEWAL_WINDOW_DAYS = 30
+
+
+def _empty_staff_stats():
+    return {'total': 0, 'completed': 0, 'pending': 0, 'scheduled': 0}
+
+
+def staff_task_counts(usernames):
+    """
+    Compute task and schedule counts for many staff members at once.
+
+    `usernames` may be a list or a `values('username')` queryset; a queryset
+    is pushed down as a subquery. Runs two grouped queries regardless of the
+    number of staff and returns {username: {'total', 'completed', 'pending',
+    'scheduled'}}. Staff without any rows get zeroed counts.
+    """
+    stats = defaultdict(_empty_staff_stats)
+
+    task_rows = (
+        Task.objects.filter(staff_assigned__in=usernames)
+        .order_by()
+        .values('staff_assigned')
+        .annotate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(status__iexact='completed')),
+            pending=Count('id', filter=Q(status__iexact='pending')),
+        )
+    )
+    for row in task_rows:
+        entry = stats[row['staff_assigned']]
+        entry['total'] = row['total']
+        entry['completed'] = row['completed']
+        entry['pending'] = row['pending']
+
+    # WeeklySchedule has no staff column; Workload holds the per-date staff schedule
+    schedule_rows = (
+        Workload.objects.filter(staff_name__in=usernames)
+        .order_by()
+        .values('staff_name')
+        .annotate(scheduled=Count('id'))
+    )
+    for row in schedule_rows:
+        stats[row['staff_name']]['scheduled'] = row['scheduled']
+
+    return stats
+
+
+def _empty_vehicle_stats():
+    return {'total_assignments': 0, 'unique_routes': 0, 'total_clients': 0}
+
+
+def vehicle_route_counts(start_date=None, end_date=None):
+    """
+    Compute route assignment counts for every vehicle in one grouped query.
+
+    Optional `start_date`/`end_date` bound `date_assigned` (inclusive).
+    Returns {plate: {'total_assignments', 'unique_routes', 'total_clients'}};
+    vehicles without assignments get zeroed counts.
+    """
+    routes = VehicleRoute.objects.all()
+
+    if start_date:
+        routes = routes.filter(date_assigned__gte=start_date)
+    if end_date:
+        routes = routes.filter(date_assigned__lte=end_date)
+
+    stats = defaultdict(_empty_vehicle_stats)
+    rows = (
+        routes.order_by()
+        .values('plate')
+        .annotate(
+            total_assignments=Count('id'),
+            unique_routes=Count('route', distinct=True),
+            total_clients=Count('client'),
+        )
+    )
+    for row in rows:
+        plate = row.pop('plate')
+        stats[plate] = row
+
+    return stats
+
+
+def contract_statistics(today, region=None):
+    """
+    Compute the admin dashboard contract figures with database aggregation.
+
+    Returns total/active/expired/renewal/prospect counts, the average bin
+    quantity and contracts started per month, in two queries whatever the
+    size of the client base. Pass `region` to restrict to one region.
+    """
+    clients = Clients.objects.all()
+    if region:
+        clients = clients.filter(region=region)
+
+    renewal_date = today + timedelta(days=RENEWAL_WINDOW_DAYS)
+
+    signed = Q(is_prospect=False)
+    stats = clients.aggregate(
+        total_contracts=Count('id'),
+        prospect_count=Count('id', filter=Q(is_prospect=True)),
+        expired_contracts=Count('id', filter=signed & Q(contract_end_date__lt=today)),
+        active_contracts=Count('id', filter=signed & Q(contract_end_date__gte=today)),
+        renewal_count=Count('id', filter=signed & Q(
+            contract_end_date__gte=today,
+            contract_end_date__lte=renewal_date,
+        )),
+        avg_bins=Avg('quantity'),
+    )
+    stats['avg_bins'] = stats['avg_bins'] or 0
+
+    monthly_rows = (
+        clients.filter(contract_start_date__isnull=False)
+        .annotate(month=TruncMonth('contract_start_date'))
+        .order_by('month')
+        .values('month')
+        .annotate(count=Count('id'))
+    )
+    stats['monthly_data'] = [
+        {"month": row['month'].strftime("%b %Y"), "count": row['count']}
+        for row in monthly_rows
+    ]
+
+    return stats
@@ -0,0 +1,92 @@
+"""
+Route → sub-region → region lookups shared by the assigners.
+
+SubRegion.routes_in_sub_region is free text; it is split once into
+SubRegionRoute rows when a SubRegion is saved, and the resulting index is
+cached in process and in Django's cache under a shared version number, so
+assigners resolve a client's route with a single dictionary lookup.
+"""
+from collections import defaultdict, namedtuple
+from django.core.cache import cache
+from django.db import transaction
+from models import SubRegion, SubRegionRoute
+from utils.cache_versions import bump_version, current_version
+
+ROUTE_INDEX_CACHE_TIMEOUT = 60 * 60
+UNMAPPED_SUB_REGION = 'unmapped_routes'
+
+_ROUTE_INDEX_VERSION_KEY = 'route_index:version'
+
+RouteLocation = namedtuple('RouteLocation', ['sub_region', 'region'])
+
+# version -> index; replaced whenever the version moves on
+_route_index_local = {}
+
+
+def normalise_route(route):
+    return (route or '').strip().lower()
+
+
+def split_routes(routes_text):
+    """Normalised route names listed in a comma-separated routes field."""
+    return {normalise_route(route) for route in (routes_text or '').split(',') if route.strip()}
+
+
+def sync_sub_region_routes(sub_region):
+    """Rewrite the SubRegionRoute rows of one SubRegion from its routes text."""
+    routes = split_routes(sub_region.routes_in_sub_region)
+
+    with transaction.atomic():
+        SubRegionRoute.objects.filter(sub_region=sub_region).exclude(route__in=routes).delete()
+        existing = set(
+            SubRegionRoute.objects.filter(sub_region=sub_region).values_list('route', flat=True)
+        )
+        SubRegionRoute.objects.bulk_create([
+            SubRegionRoute(sub_region=sub_region, route=route)
+            for route in sorted(routes - existing)
+        ])
+
+    return len(routes)
+
+
+def _build_route_index():
+    synced_routes = defaultdict(list)
+    for sub_region_id, route in SubRegionRoute.objects.values_list('sub_region_id', 'route'):
+        synced_routes[sub_region_id].append(route)
+
+    index = {}
+    for sub_region_id, sub_region, region, routes_text in SubRegion.objects.order_by('id').values_list(
+        'id', 'sub_region', 'region', 'routes_in_sub_region'
+    ):
+        # Sub-regions sync_sub_region_routes has not backfilled yet fall back to their text field
+        routes = synced_routes.get(sub_region_id) or split_routes(routes_text)
+        location = RouteLocation(normalise_route(sub_region), normalise_route(region))
+        for route in routes:
+            index[route] = location
+
+    return index
+
+
+def get_route_index():
+    """Return the {route: RouteLocation(sub_region, region)} index."""
+    version = current_version(_ROUTE_INDEX_VERSION_KEY)
+
+    index = _route_index_local.get(version)
+    if index is not None:
+        return index
+
+    cache_key = f'route_index:{version}'
+    index = cache.get(cache_key)
+    if index is None:
+        index = _build_route_index()
+        cache.set(cache_key, index, ROUTE_INDEX_CACHE_TIMEOUT)
+
+    _route_index_local.clear()
+    _route_index_local[version] = index
+    return index
+
+
+def invalidate_route_index():
+    """Drop every cached route index."""
+    _route_index_local.clear()
+    bump_version(_ROUTE_INDEX_VERSION_KEY)
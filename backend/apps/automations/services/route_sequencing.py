@@ -0,0 +1,147 @@
+"""
+Stop ordering for each vehicle's daily route.
+
+Once VehicleAssigner has decided which vehicle serves which client, the
+clients on a vehicle are ordered with a nearest-neighbour tour improved by
+2-opt over a great-circle distance matrix. Routes are open paths: the van
+does not return to the first stop, so the last edge is never counted.
+"""
+from collections import defaultdict
+from math import asin, cos, radians, sin, sqrt
+from django.db import transaction
+from models import Clients, VehicleRoute
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_km(origin, destination):
+    """Great-circle distance in km between two (lat, lng) points."""
+    lat1, lng1 = map(radians, origin)
+    lat2, lng2 = map(radians, destination)
+    a = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(sqrt(a))
+
+
+def distance_matrix(points):
+    """Symmetric matrix of haversine distances between (lat, lng) points."""
+    n = len(points)
+    matrix = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1, n):
+            matrix[i][j] = matrix[j][i] = haversine_km(points[i], points[j])
+    return matrix
+
+
+def tour_length(tour, matrix):
+    """Length of an open path visiting `tour` in order."""
+    return sum(matrix[a][b] for a, b in zip(tour, tour[1:]))
+
+
+def nearest_neighbour(matrix, start=0):
+    """Greedy tour: from `start`, always visit the closest unvisited stop. O(n²)."""
+    n = len(matrix)
+    if n == 0:
+        return []
+
+    unvisited = set(range(n))
+    unvisited.remove(start)
+    tour = [start]
+
+    while unvisited:
+        row = matrix[tour[-1]]
+        closest = min(unvisited, key=row.__getitem__)
+        unvisited.remove(closest)
+        tour.append(closest)
+
+    return tour
+
+
+def two_opt(tour, matrix, max_passes=50):
+    """
+    Improve an open-path tour by reversing segments while that shortens it.
+
+    The first stop stays fixed. Each pass is O(n²); stops after a pass
+    with no improvement or after `max_passes` passes.
+    """
+    tour = list(tour)
+    n = len(tour)
+
+    for _ in range(max_passes):
+        improved = False
+
+        for i in range(1, n - 1):
+            row_a = matrix[tour[i - 1]]
+            for j in range(i + 1, n):
+                b, c = tour[i], tour[j]
+                removed = row_a[b]
+                added = row_a[c]
+                if j + 1 < n:
+                    d = tour[j + 1]
+                    removed += matrix[c][d]
+                    added += matrix[b][d]
+
+                if added < removed - 1e-9:
+                    tour[i:j + 1] = reversed(tour[i:j + 1])
+                    improved = True
+
+        if not improved:
+            break
+
+    return tour
+
+
+def sequence_stops(matrix, start=0):
+    """Order stops with nearest-neighbour then 2-opt; returns indices into `matrix`."""
+    return two_opt(nearest_neighbour(matrix, start), matrix)
+
+
+def order_clients(clients, coordinates):
+    """
+    Order client names for one vehicle.
+
+    Clients with coordinates are sequenced by distance, starting from the
+    first in name order; clients without are appended in name order.
+    """
+    located = sorted(name for name in clients if coordinates.get(name))
+    unlocated = sorted(name for name in clients if not coordinates.get(name))
+
+    if len(located) < 3:
+        return located + unlocated
+
+    matrix = distance_matrix([coordinates[name] for name in located])
+    return [located[i] for i in sequence_stops(matrix)] + unlocated
+
+
+def sequence_vehicle_routes(service_date):
+    """Store a stop order on every VehicleRoute of `service_date`."""
+    routes_by_plate = defaultdict(list)
+    for route in VehicleRoute.objects.filter(date_assigned=service_date).only('id', 'plate', 'client'):
+        routes_by_plate[route.plate].append(route)
+
+    if not routes_by_plate:
+        print("INFO: No vehicle routes to sequence.")
+        return 0
+
+    client_names = {route.client for routes in routes_by_plate.values() for route in routes}
+    coordinates = {
+        name: (lat, lng)
+        for name, lat, lng in Clients.objects.filter(
+            company_name__in=client_names, latitude__isnull=False, longitude__isnull=False
+        ).values_list('company_name', 'latitude', 'longitude')
+    }
+
+    to_update = []
+    for plate, routes in routes_by_plate.items():
+        by_client = {route.client: route for route in routes}
+        for position, client in enumerate(order_clients(by_client, coordinates), start=1):
+            route = by_client[client]
+            route.stop_sequence = position
+            to_update.append(route)
+
+    with transaction.atomic():
+        VehicleRoute.objects.bulk_update(to_update, ['stop_sequence'], batch_size=1000)
+
+    missing = len(client_names) - len(coordinates)
+    print(f"Sequenced {len(to_update)} stops across {len(routes_by_plate)} vehicles"
+          + (f" ({missing} client(s) without coordinates placed last)" if missing else ""))
+    return len(to_update)
@@ -1,108 +1,179 @@
-from datetime import datetime, date
-from collections import defaultdict
 from django.db import transaction
-from models import Task, Clients, WeeklySchedule
-from utils.date_helper import get_date_from_string_or_obj
+from django.db.models import Max
+from django.utils import timezone
+from models import Task, Clients, WeeklySchedule, ScheduleWatermark
+
+# Candidate clients per existing-key query
+EXISTING_KEYS_CHUNK_SIZE = 1000
+
+
+def _clients_changed_since(since):
+    """Names of clients whose record or tasks were written after `since`."""
+    changed = set(
+        Task.objects.filter(updated_at__gt=since)
+        .exclude(client_assigned='')
+        .values_list('client_assigned', flat=True)
+    )
+    changed.update(
+        Clients.objects.filter(updated_at__gt=since).values_list('company_name', flat=True)
+    )
+    return changed
+
+
+def _latest_service_dates(client_names=None):
+    """Latest task due date per client, computed by the database."""
+    tasks = Task.objects.exclude(client_assigned='').filter(due_date__isnull=False)
+    if client_names is not None:
+        tasks = tasks.filter(client_assigned__in=client_names)
+
+    return dict(
+        tasks.order_by()
+        .values('client_assigned')
+        .annotate(latest_due_date=Max('due_date'))
+        .values_list('client_assigned', 'latest_due_date')
+    )
+
+
+def _schedule_candidates(client_latest_service_dates, client_names=None):
+    """Build (region, weekday, route, client, date) rows for clients with a service date."""
+    clients = Clients.objects.values_list('id', 'company_name', 'region', 'branch_asoc')
+    if client_names is not None:
+        clients = clients.filter(company_name__in=client_names)
+
+    candidates = []
+    for client_id, company_name, client_main_region, route_name in clients.iterator(chunk_size=2000):
+        if not all([company_name, client_main_region, route_name]):
+            print(f"Warning: Client {client_id} missing required fields")
+            continue
+
+        service_date_for_client = client_latest_service_dates.get(company_name)
+        if not service_date_for_client:
+            continue
+
+        candidates.append((
+            client_main_region,
+            service_date_for_client.strftime('%A'),
+            route_name,
+            company_name,
+            service_date_for_client
+        ))
+
+    return candidates
+
+
+def _existing_schedule_keys(candidates):
+    """(client, date) keys already scheduled among `candidates`, queried per chunk of clients."""
+    existing_keys = set()
+    for start in range(0, len(candidates), EXISTING_KEYS_CHUNK_SIZE):
+        chunk = candidates[start:start + EXISTING_KEYS_CHUNK_SIZE]
+        existing_keys.update(
+            WeeklySchedule.objects.filter(
+                client_name__in={candidate[3] for candidate in chunk},
+                date_to_service__in={candidate[4] for candidate in chunk}
+            ).values_list('client_name', 'date_to_service')
+        )
+    return existing_keys
+
+
+def _prune_stale_schedules(client_names, candidates):
+    """
+    Reconcile upcoming schedule rows of changed clients with their new candidates.
+
+    Rows for another date are deleted; rows for the right date whose region,
+    weekday or route moved are updated in place.
+    """
+    current = {candidate[3]: candidate for candidate in candidates}
+    stale_ids = []
+    moved = []
+
+    upcoming = WeeklySchedule.objects.filter(
+        client_name__in=client_names,
+        date_to_service__gte=timezone.localdate()
+    ).values('id', 'region', 'weekday_name', 'route', 'client_name', 'date_to_service')
+
+    for row in upcoming:
+        candidate = current.get(row['client_name'])
+
+        if candidate is None or row['date_to_service'] != candidate[4]:
+            stale_ids.append(row['id'])
+        elif (row['region'], row['weekday_name'], row['route']) != candidate[:3]:
+            region_name, weekday, route = candidate[:3]
+            moved.append(WeeklySchedule(id=row['id'], region=region_name, weekday_name=weekday, route=route))
+
+    if stale_ids:
+        WeeklySchedule.objects.filter(id__in=stale_ids).delete()
+    if moved:
+        WeeklySchedule.objects.bulk_update(moved, ['region', 'weekday_name', 'route'], batch_size=1000)
+
+    print(f"Removed {len(stale_ids)} stale and updated {len(moved)} moved schedule entries.")
 
 
 @transaction.atomic
-def routes():
+def routes(incremental=False):
     """
     Generate weekly schedules by grouping clients based on their latest service dates.
 
     Creates WeeklySchedule entries organized by:
     - Region → Weekday → Route → Client assignments
+
+    With `incremental=True`, only clients whose record or tasks changed since
+    the last run are recomputed, and their stale upcoming rows are removed.
+    Deleted tasks do not bump the watermark, so run a full pass periodically.
+    Errors propagate and roll the whole run back, so callers such as
+    the daily pipeline see the failure.
     """
     try:
-        tasks = Task.objects.all()
-        clients = Clients.objects.all()
-
-        # Build map of latest service dates per client
-        client_latest_service_dates = {}
-        for task in tasks:
-            client_name = getattr(task, 'client_assigned', None)
-            task_service_date_val = getattr(task, 'due_date', None)
-
-            if not client_name or not task_service_date_val:
-                continue
-
-            current_task_date_obj = get_date_from_string_or_obj(task_service_date_val)
-            if not current_task_date_obj:
-                print(f"Warning: Invalid date for task {getattr(task, 'id', 'N/A')}")
-                continue
-
-            # Track latest service date
-            if client_name not in client_latest_service_dates or \
-               current_task_date_obj > client_latest_service_dates[client_name]:
-                client_latest_service_dates[client_name] = current_task_date_obj
-
-        # Structure: {'Region': {'Weekday': {'RouteName': [{'client_name': 'X', 'service_date': date_obj}]}}}
-        regional_weekday_route_schedule_data = {}
-
-        for client in clients:
-            company_name = getattr(client, 'company_name', None)
-            client_main_region = getattr(client, 'region', None)
-            route_name = getattr(client, 'branch_asoc', None)
-
-            if not all([company_name, client_main_region, route_name]):
-                print(f"Warning: Client {getattr(client, 'id', 'N/A')} missing required fields")
-                continue
-
-            service_date_for_client = client_latest_service_dates.get(company_name)
-            if not service_date_for_client:
-                continue
-
-            weekday_name = service_date_for_client.strftime('%A')
-
-            # Build nested structure
-            regional_weekday_route_schedule_data \
-                .setdefault(client_main_region, {}) \
-                .setdefault(weekday_name, {}) \
-                .setdefault(route_name, []) \
-                .append({
-                    'client_name': company_name,
-                    'service_date': service_date_for_client
-                })
+        run_started_at = timezone.now()
+        watermark, _ = ScheduleWatermark.objects.select_for_update().get_or_create(pk=1)
+
+        changed_clients = None
+        if incremental and watermark.last_synced_at:
+            changed_clients = _clients_changed_since(watermark.last_synced_at)
+            print(f"Incremental schedule run: {len(changed_clients)} changed client(s).")
+
+            if not changed_clients:
+                watermark.last_synced_at = run_started_at
+                watermark.save(update_fields=['last_synced_at', 'updated_at'])
+                return
+
+        client_latest_service_dates = _latest_service_dates(changed_clients)
+        candidates = _schedule_candidates(client_latest_service_dates, changed_clients)
+
+        if changed_clients is not None:
+            _prune_stale_schedules(changed_clients, candidates)
+
+        existing_keys = _existing_schedule_keys(candidates)
 
         # Bulk create schedules (avoiding duplicates)
-        schedules_to_create = []
-
-        for region_name, weekdays_data in regional_weekday_route_schedule_data.items():
-            for weekday, routes_data in weekdays_data.items():
-                for route, client_details_list in routes_data.items():
-                    for client_detail in client_details_list:
-                        client_name = client_detail['client_name']
-                        service_date = client_detail['service_date']
-
-                        # Check for existing entry
-                        if not WeeklySchedule.objects.filter(
-                            region=region_name,
-                            weekday=weekday,
-                            route=route,
-                            client_name=client_name,
-                            date_to_service=service_date
-                        ).exists():
-                            schedules_to_create.append(
-                                WeeklySchedule(
-                                    region=region_name,
-                                    weekday=weekday,
-                                    route=route,
-                                    client_name=client_name,
-                                    date_to_service=service_date
-                                )
-                            )
+        schedules_to_create = [
+            WeeklySchedule(
+                region=region_name,
+                weekday_name=weekday,
+                route=route,
+                client_name=client_name,
+                date_to_service=service_date
+            )
+            for region_name, weekday, route, client_name, service_date in candidates
+            if (client_name, service_date) not in existing_keys
+        ]
 
         # Save to database
         if schedules_to_create:
             try:
-                WeeklySchedule.objects.bulk_create(schedules_to_create, ignore_conflicts=True)
+                WeeklySchedule.objects.bulk_create(schedules_to_create, batch_size=1000, ignore_conflicts=True)
                 print(f"Successfully saved {len(schedules_to_create)} weekly schedule entries.")
             except Exception as db_error:
+                # Rolls back with the watermark, so these clients are retried next run
                 print(f"Error during bulk_create: {db_error}")
+                raise
         else:
             print("No new schedule entries to save.")
 
+        watermark.last_synced_at = run_started_at
+        watermark.save(update_fields=['last_synced_at', 'updated_at'])
+
     except Exception as e:
         import traceback
         print(f"An error occurred in routes(): {e}")
         traceback.print_exc()
+        raise
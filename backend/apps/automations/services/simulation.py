@@ -0,0 +1,123 @@
+"""
+What-if simulation of the daily assignment.
+
+simulate_assignments() runs staff allocation and vehicle assignment for a
+range of dates on in-memory snapshots, with optional hypothetical staff
+leave and vehicle outages, and writes nothing. Each day is compared with
+what is stored today: Workload for staff, VehicleRoute for vehicles.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from models import VehicleRoute, Workload
+from services.auto_tasks.assigner import REGION_PRIORITY, max_bins_setting
+from services.auto_tasks.snapshot import load_assignment_snapshots
+from services.auto_tasks.staff_allocator import get_allocator
+from services.vehicle import VehicleAssigner
+
+MAX_SIMULATION_DAYS = 14
+
+
+def _date_range(start_date, end_date):
+    return [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+
+
+def _leave_by_date(staff_on_leave, dates):
+    """Accept usernames on leave for the whole range, or {date: usernames}."""
+    if isinstance(staff_on_leave, dict):
+        return {day: set(usernames) for day, usernames in staff_on_leave.items()}
+    return {day: set(staff_on_leave) for day in dates}
+
+
+def _current_assignments(dates):
+    """({date: {client: staff}}, {date: {client: vehicle}}) as stored now."""
+    staff = defaultdict(dict)
+    for client, staff_name, day in Workload.objects.filter(date_assigned__in=dates).values_list(
+        'client_assigned', 'staff_name', 'date_assigned'
+    ):
+        staff[day][client] = staff_name
+
+    vehicles = defaultdict(dict)
+    for client, plate, day in VehicleRoute.objects.filter(date_assigned__in=dates).values_list(
+        'client', 'plate', 'date_assigned'
+    ):
+        vehicles[day][client] = plate
+
+    return staff, vehicles
+
+
+def diff_assignments(current, simulated):
+    """Changes from `current` to `simulated`, both {client: assignee}."""
+    added = {client: assignee for client, assignee in simulated.items() if client not in current}
+    removed = {client: assignee for client, assignee in current.items() if client not in simulated}
+    changed = {
+        client: {'current': current[client], 'simulated': assignee}
+        for client, assignee in simulated.items()
+        if client in current and current[client] != assignee
+    }
+    return {
+        'added': added,
+        'removed': removed,
+        'changed': changed,
+        'unchanged': len(simulated) - len(added) - len(changed),
+    }
+
+
+def simulate_assignments(start_date, end_date=None, staff_on_leave=(), vehicles_out=(),
+                         allocation_engine=None, team_strategy='greedy', seed=0, include_vehicles=True):
+    """
+    Dry-run the assignment for every date from `start_date` to `end_date`.
+
+    Inputs for the whole range come from one snapshot load. Each day is
+    allocated independently, as the nightly job would on that day, with the
+    nightly job's engine unless `allocation_engine` names another.
+    """
+    end_date = end_date or start_date
+    if end_date < start_date:
+        raise ValueError("end_date is before start_date.")
+
+    dates = _date_range(start_date, end_date)
+    if len(dates) > MAX_SIMULATION_DAYS:
+        raise ValueError(f"Simulations cover at most {MAX_SIMULATION_DAYS} days.")
+
+    snapshots = load_assignment_snapshots(dates, staff_on_leave=_leave_by_date(staff_on_leave, dates))
+    allocator = get_allocator(allocation_engine, seed)
+    max_bins = max_bins_setting()
+    current_staff, current_vehicles = _current_assignments(dates)
+
+    days = []
+    for day in dates:
+        allocation = allocator.allocate(snapshots[day], max_bins, REGION_PRIORITY)
+        simulated_staff = {
+            client: staff
+            for staff, clients in allocation.assignments.items()
+            for client in clients
+        }
+
+        result = {
+            'date': day.isoformat(),
+            'staff': diff_assignments(current_staff[day], simulated_staff),
+            'workloads': dict(allocation.workloads),
+            'unassigned_clients': sorted(allocation.unassigned),
+        }
+
+        if include_vehicles:
+            vehicle_assigner = VehicleAssigner(
+                team_strategy, service_date=day, dry_run=True,
+                client_names=list(simulated_staff), unavailable_vehicles=vehicles_out
+            )
+            vehicle_assigner.run()
+            result['vehicles'] = diff_assignments(current_vehicles[day], vehicle_assigner.planned_routes())
+            result['unassigned_vehicle_clients'] = sorted(
+                client
+                for entry in vehicle_assigner.final_summary_unassigned
+                for client in entry['clients']
+            )
+
+        days.append(result)
+
+    return {
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'allocation_engine': allocator.name,
+        'days': days,
+    }
@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
 from django.db import transaction
 from models import Task, Notification, Clients, User
+from utils.date_helper import parse_date
 from utils.validators import validate_staff_availability, StaffValidationError
 from .notifications import send_mail, send_sms_staff, send_sms_client
 
@@ -15,6 +16,10 @@ def assigned_task(username, client_id, description, status, priority, due_date):
     except StaffValidationError as e:
         raise ValueError(f"Cannot assign task: {e}")
 
+    service_date = parse_date(due_date)
+    if service_date is None:
+        raise ValueError(f"Cannot assign task: invalid due date {due_date!r}")
+
     # Get client details
     client = Clients.objects.filter(contract_id=client_id).values(
         'services_required', 'frequency', 'premise_location', 'company_name'
@@ -33,7 +38,7 @@ def assigned_task(username, client_id, description, status, priority, due_date):
         description=description,
         status=status,
         priority=priority,
-        due_date=due_date
+        due_date=service_date
     )
 
     # Create notification
@@ -44,13 +49,13 @@ def assigned_task(username, client_id, description, status, priority, due_date):
         frequency=client['frequency'],
         premise_location=client['premise_location'],
         description=description,
-        due_date=due_date,
+        due_date=service_date,
         priority=priority,
         status=status
     )
 
     # Send notifications (optional)
-    _send_assignment_notifications(username, client['company_name'], due_date)
+    _send_assignment_notifications(username, client['company_name'], service_date)
 
     return task
 
@@ -1,7 +1,12 @@
 from datetime import datetime, timedelta
 from collections import defaultdict
-from django.db import transaction
-from models import Workload, VehicleRoute, Vehicles, Clients, SubRegion
+from django.db import connection, transaction
+from models import Workload, VehicleRoute, Vehicles, Clients, UnassignedVehicles
+from services.vehicle_teams import TeamCandidate, get_team_selector
+from services.vehicle_packing import PackedVehicle, pack_clients
+from services.route_sequencing import sequence_vehicle_routes
+from services.route_index import UNMAPPED_SUB_REGION, get_route_index, normalise_route
+from services.capabilities import can_serve, describe_mask, offered_mask, required_mask, service_names_by_bit
 
 
 class VehicleAssigner:
@@ -10,17 +15,41 @@ class VehicleAssigner:
 
     Strategies:
     1. Single multi-service vehicle (if available)
-    2. Team assembly of specialist vehicles
-    3. Mark as unassigned if no solution found
+    2. Team assembly of specialist vehicles, chosen by a pluggable selector
+       ('greedy' or 'exact', see services.vehicle_teams), with clients packed
+       onto the team by bin capacity (see services.vehicle_packing)
+    3. Split clients the team cannot carry across the region's other vehicles
+    4. Record whatever is left in UnassignedVehicles
+
+    Vehicles.capacity (bins) is tracked across sub-regions and checked per
+    vehicle on every assignment, so a vehicle is never given more bins than it
+    can carry. A team is chosen on total capacity, but its clients are packed
+    vehicle by vehicle. Vehicles without a recorded capacity are unlimited.
+
+    With `dry_run=True` nothing is written; the planned routes are kept in
+    `routes_to_save`. `client_names` replaces the day's Workload rows and
+    `unavailable_vehicles` takes vehicles out of service, for what-if runs.
     """
 
-    def __init__(self):
-        self.service_date = datetime.today().date() + timedelta(days=1)
+    def __init__(self, team_strategy='greedy', service_date=None, dry_run=False,
+                 client_names=None, unavailable_vehicles=()):
+        self.service_date = service_date or datetime.today().date() + timedelta(days=1)
+        self.team_selector = get_team_selector(team_strategy)
+        self.dry_run = dry_run
+        self.client_names = client_names
+        self.unavailable_vehicles = set(unavailable_vehicles)
 
         # Data structures
         self.assignments_by_subregion = defaultdict(lambda: defaultdict(list))
         self.vehicles_by_region = defaultdict(list)
         self.vehicle_specs = {}
+        self.vehicle_capacity = {}
+        self.vehicle_capacity_left = {}
+        self.vehicle_load = defaultdict(int)
+        self.clients_by_name = {}
+        self.service_names = {}
+        self.routes_to_save = []
+        self.unassigned_to_save = []
 
         # Results tracking
         self.final_summary_assigned = defaultdict(lambda: {
@@ -49,102 +78,162 @@ class VehicleAssigner:
 
     def _group_assignments_by_location(self):
         """Group assigned clients by region and sub-region."""
-        workloads = Workload.objects.filter(date_assigned=self.service_date)
-
-        if not workloads.exists():
-            return
-
-        # Get client locations
-        client_names = workloads.values_list('client_assigned', flat=True)
-        client_locations = {
-            client.company_name: (client.region, client.branch_asoc)
-            for client in Clients.objects.filter(company_name__in=client_names)
+        if self.client_names is not None:
+            client_names = list(self.client_names)
+        else:
+            workloads = Workload.objects.filter(date_assigned=self.service_date)
+
+            if not workloads.exists():
+                return
+
+            client_names = workloads.values_list('client_assigned', flat=True)
+
+        # Load every client needed for this run once, with its capability mask
+        client_rows = Clients.objects.filter(company_name__in=client_names).values(
+            'company_name', 'region', 'branch_asoc', 'service_mask', 'quantity'
+        )
+        self.clients_by_name = {
+            row['company_name']: {
+                'region': row['region'],
+                'route': row['branch_asoc'],
+                'mask': required_mask(row['service_mask']),
+                'quantity': row['quantity'] or 0,
+            }
+            for row in client_rows
         }
+        self.service_names = service_names_by_bit()
 
-        # Build route → sub-region mapping
-        route_to_subregion_map = {}
-        for sub in SubRegion.objects.all():
-            routes_str = getattr(sub, 'routes_in_sub_region', '')
-            for route in routes_str.split(','):
-                route_to_subregion_map[route.strip().lower()] = sub.name.strip().lower()
+        route_index = get_route_index()
 
         # Group clients
-        for item in workloads:
-            client_name = item.client_assigned
-            location = client_locations.get(client_name)
+        for client_name in client_names:
+            client = self.clients_by_name.get(client_name)
 
-            if not location:
+            if not client:
                 continue
 
-            region, route = location
-            region = region.strip().lower()
-            route = route.strip().lower()
+            region = client['region'].strip().lower()
+            location = route_index.get(normalise_route(client['route']))
 
-            sub_region = route_to_subregion_map.get(route, 'unmapped_routes')
+            sub_region = location.sub_region if location else UNMAPPED_SUB_REGION
             self.assignments_by_subregion[region][sub_region].append(client_name)
 
     def _load_vehicles(self):
         """Load available vehicles and cache their capabilities."""
-        for vehicle in Vehicles.objects.filter(is_available=True):
+        for vehicle in Vehicles.objects.filter(is_available=True).exclude(
+            vehicle_name__in=self.unavailable_vehicles
+        ):
             region = vehicle.region.strip().lower()
             self.vehicles_by_region[region].append(vehicle)
+            self.vehicle_capacity[vehicle.vehicle_name] = vehicle.capacity
+            self.vehicle_capacity_left[vehicle.vehicle_name] = vehicle.capacity
 
             self.vehicle_specs[vehicle.vehicle_name] = {
                 'can_handle_all': vehicle.can_handle_all_services,
-                'specs': set(s.strip().lower() for s in vehicle.specialization.split(',') if s.strip())
+                'mask': offered_mask(vehicle.service_mask)
             }
 
-    def _get_required_services_for_subregion(self, client_names):
-        """Extract unique services.py required by a group of clients."""
-        required_services = set()
-        clients = Clients.objects.filter(company_name__in=client_names)
+    def _get_required_mask_for_subregion(self, client_names):
+        """OR of the service masks required by a group of clients."""
+        required_mask = 0
+
+        for client_name in client_names:
+            client = self.clients_by_name.get(client_name)
+            if client:
+                required_mask |= client['mask']
+
+        return required_mask
+
+    def _get_demand_for_subregion(self, client_names):
+        """Total bins required by a group of clients."""
+        return sum(
+            self.clients_by_name[client_name]['quantity']
+            for client_name in client_names
+            if client_name in self.clients_by_name
+        )
+
+    def _has_capacity_for(self, vehicle_name, demand):
+        capacity_left = self.vehicle_capacity_left.get(vehicle_name)
+        return capacity_left is None or capacity_left >= demand
+
+    def _consume_capacity(self, vehicle_name, amount):
+        if not self._has_capacity_for(vehicle_name, amount):
+            raise ValueError(
+                f"{vehicle_name} has {self.vehicle_capacity_left[vehicle_name]} bin(s) left, cannot take {amount}"
+            )
+        self.vehicle_load[vehicle_name] += amount
+        if self.vehicle_capacity_left.get(vehicle_name) is not None:
+            self.vehicle_capacity_left[vehicle_name] -= amount
+
+    def _pack_clients(self, client_names, vehicles):
+        """Pack clients onto vehicles by bin capacity; returns (assignment map, overflow)."""
+        items = []
+        for client_name in client_names:
+            client = self.clients_by_name.get(client_name)
+            if client:
+                items.append((client_name, client['quantity'], client['mask']))
+
+        packed_vehicles = [
+            PackedVehicle(
+                vehicle.vehicle_name,
+                self.vehicle_capacity_left.get(vehicle.vehicle_name),
+                self.vehicle_specs[vehicle.vehicle_name]['can_handle_all'],
+                self.vehicle_specs[vehicle.vehicle_name]['mask']
+            )
+            for vehicle in vehicles
+        ]
+
+        assignment_map, overflow, used = pack_clients(items, packed_vehicles)
+        for vehicle in used:
+            self._consume_capacity(vehicle.name, vehicle.load)
 
-        for client in clients:
-            services_str = getattr(client, 'services_required', '')
-            if services_str:
-                required_services.update(s.strip().lower() for s in services_str.split(',') if s.strip())
+        return assignment_map, overflow
 
-        return required_services
+    def _record_unassigned(self, region, sub_region_name, client_names):
+        """Track clients no vehicle could take, for the report and UnassignedVehicles."""
+        required_mask = self._get_required_mask_for_subregion(client_names)
 
-    def _find_vehicle_for_service_set(self, available_vehicles, required_services):
-        """Find a single vehicle capable of handling all required services.py."""
+        self.final_summary_unassigned.append({
+            'region': region,
+            'sub_region': sub_region_name,
+            'clients': client_names,
+            'required_services': describe_mask(required_mask, self.service_names)
+        })
+        self.unassigned_to_save.append(UnassignedVehicles(
+            region=region,
+            route_name=sub_region_name,
+            client=', '.join(client_names)[:5000],
+            reason="No compatible vehicle with enough capacity"
+        ))
+
+    def _find_vehicle_for_service_set(self, available_vehicles, required_mask, demand=0):
+        """Find a single vehicle capable of handling all required services.py and bins."""
         for vehicle in available_vehicles:
             specs = self.vehicle_specs[vehicle.vehicle_name]
 
-            is_compatible = (
-                specs['can_handle_all'] or
-                required_services.issubset(specs['specs'])
-            )
-
-            if is_compatible:
+            if (can_serve(specs['mask'], required_mask, specs['can_handle_all'])
+                    and self._has_capacity_for(vehicle.vehicle_name, demand)):
                 return vehicle
 
         return None
 
-    def _assemble_vehicle_team(self, available_vehicles, required_services):
-        """Create a team of specialist vehicles to cover all services.py."""
-        uncovered_services = set(required_services)
-        team = []
+    def _assemble_vehicle_team(self, available_vehicles, required_mask, demand=0):
+        """Create a team of specialist vehicles to cover all services.py and bins."""
+        vehicles_by_name = {vehicle.vehicle_name: vehicle for vehicle in available_vehicles}
 
+        candidates = []
         for vehicle in available_vehicles:
-            if not uncovered_services:
-                break
-
             specs = self.vehicle_specs[vehicle.vehicle_name]
+            mask = required_mask if specs['can_handle_all'] else specs['mask'] & required_mask
+            candidates.append(TeamCandidate(
+                vehicle.vehicle_name, mask, self.vehicle_capacity_left.get(vehicle.vehicle_name)
+            ))
 
-            if specs['can_handle_all']:
-                return [vehicle]
-
-            services_this_vehicle_can_cover = uncovered_services & specs['specs']
-
-            if services_this_vehicle_can_cover:
-                team.append(vehicle)
-                uncovered_services -= services_this_vehicle_can_cover
-
-        if uncovered_services:
+        team = self.team_selector.select(candidates, required_mask, demand)
+        if not team:
             return None
 
-        return team
+        return [vehicles_by_name[candidate.name] for candidate in team]
 
     @transaction.atomic
     def _process_assignments(self):
@@ -166,15 +255,17 @@ class VehicleAssigner:
             for sub_region_name, client_list in sorted_sub_regions:
                 print(f"\n  Sub-Region: {sub_region_name.title()} ({len(client_list)} clients)")
 
-                required_services = self._get_required_services_for_subregion(client_list)
-                print(f"    Required Services: {sorted(required_services)}")
+                required_mask = self._get_required_mask_for_subregion(client_list)
+                demand = self._get_demand_for_subregion(client_list)
+                print(f"    Required Services: {describe_mask(required_mask, self.service_names)} | Bins: {demand}")
 
                 # Strategy 1: Single Vehicle
-                single_vehicle = self._find_vehicle_for_service_set(vehicles_in_region, required_services)
+                single_vehicle = self._find_vehicle_for_service_set(vehicles_in_region, required_mask, demand)
 
                 if single_vehicle:
                     assignment_map = {client: single_vehicle.vehicle_name for client in client_list}
                     self._save_assignments(assignment_map, client_list)
+                    self._consume_capacity(single_vehicle.vehicle_name, demand)
 
                     self.final_summary_assigned[single_vehicle.vehicle_name]['region'] = region
                     self.final_summary_assigned[single_vehicle.vehicle_name]['sub_regions'].add(sub_region_name)
@@ -182,59 +273,84 @@ class VehicleAssigner:
                     print(f"     ✓ Assigned single vehicle: {single_vehicle.vehicle_name}")
                     continue
 
-                # Strategy 2: Vehicle Team
-                team = self._assemble_vehicle_team(vehicles_in_region, required_services)
-
-                if team:
-                    assignment_map = {}
-                    for client in client_list:
-                        for vehicle in team:
-                            client_obj = Clients.objects.filter(company_name=client).first()
-                            if not client_obj:
-                                continue
+                # Strategy 2: Vehicle Team, packed by bin capacity
+                team = self._assemble_vehicle_team(vehicles_in_region, required_mask, demand)
+                assignment_map, overflow = self._pack_clients(client_list, team or [])
 
-                            client_services = set(s.strip().lower() for s in client_obj.services_required.split(','))
-                            vehicle_specs = self.vehicle_specs[vehicle.vehicle_name]
-
-                            if vehicle_specs['can_handle_all'] or client_services.issubset(vehicle_specs['specs']):
-                                assignment_map[client] = vehicle.vehicle_name
-                                break
+                # Strategy 3: Split what is left across any vehicle in the region
+                if overflow:
+                    split_map, overflow = self._pack_clients(overflow, vehicles_in_region)
+                    assignment_map.update(split_map)
 
+                if assignment_map:
                     self._save_assignments(assignment_map, client_list)
 
-                    for vehicle in team:
-                        self.final_summary_assigned[vehicle.vehicle_name]['region'] = region
-                        self.final_summary_assigned[vehicle.vehicle_name]['sub_regions'].add(sub_region_name)
+                    used_vehicles = sorted(set(assignment_map.values()))
+                    for vehicle_name in used_vehicles:
+                        self.final_summary_assigned[vehicle_name]['region'] = region
+                        self.final_summary_assigned[vehicle_name]['sub_regions'].add(sub_region_name)
 
-                    print(f"     ✓ Assigned vehicle team: {[v.vehicle_name for v in team]}")
-                    continue
+                    print(f"     ✓ Assigned vehicles: {used_vehicles}")
 
-                # Strategy 3: Mark as Unassigned
-                print(f"     ✗ No compatible vehicle/team found")
-                self.final_summary_unassigned.append({
-                    'region': region,
-                    'sub_region': sub_region_name,
-                    'clients': client_list,
-                    'required_services': sorted(required_services)
-                })
+                # Strategy 4: Record overflow as unassigned
+                if overflow:
+                    print(f"     ✗ {len(overflow)} client(s) without a compatible vehicle with capacity")
+                    self._record_unassigned(region, sub_region_name, overflow)
+
+        self._flush_assignments()
 
     def _save_assignments(self, assignment_map, client_list):
-        """Persist vehicle assignments to database."""
+        """Queue vehicle assignments for the end-of-run upsert."""
+        queued = 0
         for client_name, vehicle_name in assignment_map.items():
-            client_obj = Clients.objects.filter(company_name=client_name).first()
+            client_obj = self.clients_by_name.get(client_name)
 
             if not client_obj:
                 continue
 
-            VehicleRoute.objects.update_or_create(
-                client_name=client_name,
-                defaults={
-                    'vehicle_name': vehicle_name,
-                    'date_assigned': self.service_date
-                }
-            )
+            self.routes_to_save.append(VehicleRoute(
+                plate=vehicle_name,
+                route=client_obj['route'],
+                client=client_name,
+                region=client_obj['region'],
+                date_assigned=self.service_date
+            ))
+            queued += 1
+
+        print(f"     → Queued {queued} of {len(client_list)} assignments")
+
+    def planned_routes(self):
+        """{client: vehicle} planned by a dry run."""
+        return {route.client: route.plate for route in self.routes_to_save}
+
+    def _flush_assignments(self):
+        """Persist all queued vehicle assignments in one upsert, plus any overflow."""
+        if self.dry_run:
+            print(f"\nDry run: {len(self.routes_to_save)} vehicle assignments not saved")
+            return
 
-        print(f"     → Saved {len(client_list)} assignments to database")
+        if self.unassigned_to_save:
+            UnassignedVehicles.objects.bulk_create(self.unassigned_to_save, batch_size=1000)
+            self.unassigned_to_save = []
+
+        if not self.routes_to_save:
+            return
+
+        # MySQL upserts on any unique key and rejects an explicit conflict target
+        conflict_target = {}
+        if connection.features.supports_update_conflicts_with_target:
+            conflict_target['unique_fields'] = ['client', 'date_assigned']
+
+        VehicleRoute.objects.bulk_create(
+            self.routes_to_save,
+            batch_size=1000,
+            update_conflicts=True,
+            update_fields=['plate', 'route', 'region', 'updated_at'],
+            **conflict_target
+        )
+
+        print(f"\nSaved {len(self.routes_to_save)} vehicle assignments to database")
+        self.routes_to_save = []
 
     def _generate_report(self):
         """Print summary of vehicle assignments."""
@@ -256,12 +372,33 @@ class VehicleAssigner:
                 print(f"  Region: {details['region'].title()} | "
                       f"Sub-Region: {details['sub_region'].title()} | "
                       f"Clients: {len(details['clients'])} | "
-                      f"Missing Services: {details['required_services']}")
+                      f"Services: {details['required_services']}")
+
+        if self.vehicle_load:
+            print("\n[=] Fleet Utilisation:")
+            total_load = 0
+            total_capacity = 0
+            for vehicle, load in sorted(self.vehicle_load.items()):
+                capacity = self.vehicle_capacity.get(vehicle)
+                if capacity:
+                    total_load += load
+                    total_capacity += capacity
+                    print(f"  {vehicle}: {load}/{capacity} bins ({load / capacity:.0%})")
+                else:
+                    print(f"  {vehicle}: {load} bins (no capacity set)")
+
+            if total_capacity:
+                print(f"  Fleet: {total_load}/{total_capacity} bins ({total_load / total_capacity:.0%})")
 
         print(f"\n{'='*60}\n")
 
 
-def vehicle_enroute():
-    """Entry point for vehicle assignment."""
-    assigner = VehicleAssigner()
-    return assigner.run()
+def vehicle_enroute(team_strategy='greedy'):
+    """Entry point for vehicle assignment, followed by stop ordering per vehicle."""
+    assigner = VehicleAssigner(team_strategy=team_strategy)
+    summary = assigner.run()
+
+    if summary:
+        sequence_vehicle_routes(assigner.service_date)
+
+    return summary
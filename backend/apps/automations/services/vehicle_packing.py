@@ -0,0 +1,123 @@
+"""
+Capacity-constrained packing of clients onto vehicles.
+
+Clients are items sized by their bin quantity; vehicles are bins sized by
+their remaining capacity and restricted to the services they can handle,
+both sides given as capability masks (see services.capabilities).
+First-fit-decreasing builds the packing, then a local-search pass tries to
+empty lightly loaded vehicles into the others.
+"""
+
+
+class PackedVehicle:
+    """A vehicle being filled; `capacity` is the room left before packing, or None for unlimited."""
+
+    __slots__ = ('name', 'capacity', 'can_handle_all', 'mask', 'load', 'clients')
+
+    def __init__(self, name, capacity, can_handle_all, mask):
+        self.name = name
+        self.capacity = capacity
+        self.can_handle_all = can_handle_all
+        self.mask = mask
+        self.load = 0
+        self.clients = []
+
+    def can_serve(self, services):
+        return self.can_handle_all or not services & ~self.mask
+
+    def fits(self, quantity, services, load=None):
+        load = self.load if load is None else load
+        return self.can_serve(services) and (self.capacity is None or load + quantity <= self.capacity)
+
+    def add(self, item):
+        self.clients.append(item)
+        self.load += item[1]
+
+
+def first_fit_decreasing(items, vehicles):
+    """
+    Place (client, quantity, service mask) items largest first.
+
+    Each item goes into the first already-used vehicle it fits, otherwise the
+    next unused vehicle in `vehicles` order. Returns (used vehicles, overflow
+    client names).
+    """
+    used = []
+    unused = list(vehicles)
+    overflow = []
+
+    for item in sorted(items, key=lambda i: i[1], reverse=True):
+        _, quantity, services = item
+
+        target = next((v for v in used if v.fits(quantity, services)), None)
+        if target is None:
+            target = next((v for v in unused if v.fits(quantity, services)), None)
+            if target is not None:
+                unused.remove(target)
+                used.append(target)
+
+        if target is None:
+            overflow.append(item[0])
+            continue
+
+        target.add(item)
+
+    return used, overflow
+
+
+def _relocate(vehicle, others):
+    """Plan moving every client off `vehicle` into `others`; None if any does not fit."""
+    loads = {other.name: other.load for other in others}
+    moves = []
+
+    for item in sorted(vehicle.clients, key=lambda i: i[1], reverse=True):
+        _, quantity, services = item
+        target = next((o for o in others if o.fits(quantity, services, loads[o.name])), None)
+        if target is None:
+            return None
+
+        loads[target.name] += quantity
+        moves.append((item, target))
+
+    return moves
+
+
+def improve_packing(used):
+    """Local search: empty the lightest vehicles into the rest while that is possible."""
+    improved = True
+
+    while improved and len(used) > 1:
+        improved = False
+
+        for vehicle in sorted(used, key=lambda v: v.load):
+            others = [v for v in used if v is not vehicle]
+            moves = _relocate(vehicle, others)
+            if moves is None:
+                continue
+
+            for item, target in moves:
+                target.add(item)
+            vehicle.clients = []
+            vehicle.load = 0
+            used.remove(vehicle)
+            improved = True
+            break
+
+    return used
+
+
+def pack_clients(items, vehicles):
+    """
+    Pack clients onto vehicles.
+
+    Returns ({client: vehicle name}, overflow client names, used vehicles).
+    """
+    used, overflow = first_fit_decreasing(items, vehicles)
+    used = improve_packing(used)
+
+    assignment_map = {
+        client: vehicle.name
+        for vehicle in used
+        for client, _, _ in vehicle.clients
+    }
+    return assignment_map, overflow, used
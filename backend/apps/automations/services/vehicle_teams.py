@@ -0,0 +1,121 @@
+"""
+Vehicle team selection for VehicleAssigner.
+
+A team must cover every service a sub-region needs and, together, have
+enough remaining capacity for its bins. Services are encoded as the stored
+capability bitmasks, so coverage checks are integer ORs.
+"""
+from collections import namedtuple
+from itertools import combinations
+
+# capacity is the remaining bin capacity, or None for unlimited
+TeamCandidate = namedtuple('TeamCandidate', ['name', 'mask', 'capacity'])
+
+
+def _total_capacity(team):
+    if any(vehicle.capacity is None for vehicle in team):
+        return None
+    return sum(vehicle.capacity for vehicle in team)
+
+
+def _has_capacity(team, demand):
+    total = _total_capacity(team)
+    return total is None or total >= demand
+
+
+def _spare_capacity(team, demand):
+    total = _total_capacity(team)
+    return float('inf') if total is None else total - demand
+
+
+class GreedyTeamSelector:
+    """
+    Greedy max-coverage heuristic.
+
+    Repeatedly takes the vehicle covering the most uncovered services
+    (ties broken by remaining capacity), then tops up capacity with the
+    largest remaining vehicles. O(n²) in the number of vehicles.
+    """
+
+    name = 'greedy'
+
+    def select(self, candidates, full_mask, demand=0):
+        available = [c for c in candidates if c.mask and (c.capacity is None or c.capacity > 0)]
+        team = []
+        uncovered = full_mask
+
+        while uncovered:
+            best = max(
+                available,
+                key=lambda c: (bin(c.mask & uncovered).count('1'), c.capacity is None, c.capacity or 0),
+                default=None
+            )
+            if best is None or not best.mask & uncovered:
+                return None
+
+            team.append(best)
+            available.remove(best)
+            uncovered &= ~best.mask
+
+        # Top up capacity with the largest remaining vehicles
+        available.sort(key=lambda c: (c.capacity is None, c.capacity or 0), reverse=True)
+        while not _has_capacity(team, demand):
+            if not available:
+                return None
+            team.append(available.pop(0))
+
+        return team
+
+
+class ExactTeamSelector:
+    """
+    Exact minimum-size team by enumerating subsets in increasing size.
+
+    Among teams of the smallest size, the one with the least spare capacity
+    wins, keeping large vehicles free for later sub-regions. Regions with more
+    than `max_vehicles` candidates fall back to the greedy heuristic.
+    """
+
+    name = 'exact'
+
+    def __init__(self, max_vehicles=16):
+        self.max_vehicles = max_vehicles
+        self.fallback = GreedyTeamSelector()
+
+    def select(self, candidates, full_mask, demand=0):
+        available = [c for c in candidates if c.mask and (c.capacity is None or c.capacity > 0)]
+
+        if len(available) > self.max_vehicles:
+            return self.fallback.select(candidates, full_mask, demand)
+
+        for size in range(1, len(available) + 1):
+            best = None
+            for team in combinations(available, size):
+                covered = 0
+                for vehicle in team:
+                    covered |= vehicle.mask
+                if covered & full_mask != full_mask or not _has_capacity(team, demand):
+                    continue
+
+                spare = _spare_capacity(team, demand)
+                if best is None or spare < best[0]:
+                    best = (spare, team)
+
+            if best is not None:
+                return list(best[1])
+
+        return None
+
+
+TEAM_SELECTORS = {
+    GreedyTeamSelector.name: GreedyTeamSelector,
+    ExactTeamSelector.name: ExactTeamSelector,
+}
+
+
+def get_team_selector(name='greedy'):
+    """Instantiate a team selector by name."""
+    try:
+        return TEAM_SELECTORS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown team selector '{name}'. Choose from: {', '.join(sorted(TEAM_SELECTORS))}")
@@ -0,0 +1,116 @@
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_delete, pre_save
+from django.dispatch import receiver
+from models import DashboardItems, Clients, Task, WeeklySchedule, SubRegion, ServicesOffered, User, Vehicles
+from models.location import FrequencySettings
+from services.capabilities import (
+    LEGACY_SERVICE_FIELDS, assign_service_bit, clear_service_bit, invalidate_service_lookup,
+    next_service_bit, refresh_service_mask, sync_capabilities
+)
+from services.dashboard import mark_dashboard_snapshots_stale
+from services.route_index import invalidate_route_index, sync_sub_region_routes
+from utils.api_utils import invalidate_dashboard_menu
+from utils.date_helper import invalidate_frequency_intervals
+
+
+@receiver([post_save, post_delete], sender=DashboardItems)
+def dashboard_items_changed(sender, **kwargs):
+    """Drop cached dashboard menus whenever a menu item changes."""
+    invalidate_dashboard_menu()
+
+
+@receiver([pre_save, pre_delete], sender=Clients)
+@receiver([pre_save, pre_delete], sender=WeeklySchedule)
+def regional_dashboard_data_changing(sender, instance, **kwargs):
+    """Remember the region the row has in the database, which the write may change."""
+    instance._stored_region = (
+        sender.objects.filter(pk=instance.pk).values_list('region', flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver([post_save, post_delete], sender=Clients)
+@receiver([post_save, post_delete], sender=WeeklySchedule)
+def regional_dashboard_data_changed(sender, instance, **kwargs):
+    """Flag the dashboard snapshots of the row's old and new region."""
+    mark_dashboard_snapshots_stale(instance.region, getattr(instance, '_stored_region', None))
+
+
+@receiver([post_save, post_delete], sender=Task)
+def task_dashboard_data_changed(sender, **kwargs):
+    """Tasks carry no region, so flag every dashboard snapshot."""
+    mark_dashboard_snapshots_stale()
+
+
+@receiver(post_save, sender=SubRegion)
+def sub_region_saved(sender, instance, **kwargs):
+    """Re-split the sub-region's routes and drop the cached route index."""
+    sync_sub_region_routes(instance)
+    invalidate_route_index()
+
+
+@receiver(post_delete, sender=SubRegion)
+def sub_region_deleted(sender, **kwargs):
+    """SubRegionRoute rows cascade; only the cached index needs dropping."""
+    invalidate_route_index()
+
+
+@receiver([post_save, post_delete], sender=FrequencySettings)
+def frequency_settings_changed(sender, **kwargs):
+    """Drop the cached frequency table whenever a frequency changes."""
+    invalidate_frequency_intervals()
+
+
+@receiver(pre_save, sender=ServicesOffered)
+def service_offered_bit_available(sender, instance, **kwargs):
+    """Refuse a new service once every capability bit is taken (next_service_bit raises)."""
+    if instance.bit is None:
+        next_service_bit()
+
+
+@receiver(post_save, sender=ServicesOffered)
+def service_offered_saved(sender, instance, **kwargs):
+    """Give each new service its own bit and drop the cached name lookup."""
+    if instance.bit is None:
+        assign_service_bit(instance)
+    invalidate_service_lookup()
+
+
+@receiver(pre_delete, sender=ServicesOffered)
+def service_offered_deleted(sender, instance, **kwargs):
+    """Link rows cascade without m2m_changed, so clear the bit from stored masks."""
+    clear_service_bit(instance)
+
+
+@receiver(post_delete, sender=ServicesOffered)
+def service_offered_removed(sender, **kwargs):
+    invalidate_service_lookup()
+
+
+@receiver(post_save, sender=Clients)
+@receiver(post_save, sender=Vehicles)
+@receiver(post_save, sender=User)
+def capability_source_saved(sender, instance, update_fields=None, **kwargs):
+    """Re-derive service links when the legacy services field may have changed."""
+    if update_fields is None or LEGACY_SERVICE_FIELDS[sender] in update_fields:
+        sync_capabilities(instance)
+
+
+@receiver(m2m_changed, sender=Clients.services.through)
+@receiver(m2m_changed, sender=Vehicles.services.through)
+@receiver(m2m_changed, sender=User.services.through)
+def capability_links_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """Keep service_mask in step with the services links."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    # sync_capabilities stores the mask itself once the links are set
+    if getattr(instance, '_syncing_capabilities', False):
+        return
+
+    if not reverse:
+        refresh_service_mask(instance)
+        return
+
+    # Edited from the ServicesOffered side: refresh the entities on the other end
+    for entity in model.objects.filter(pk__in=pk_set or []):
+        refresh_service_mask(entity)
@@ -1,8 +1,12 @@
 from django.http import JsonResponse
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.paginator import Paginator
 from django.db import models
 from django.forms.models import model_to_dict
 from datetime import datetime, date
+from utils.cache_versions import bump_version, current_version
+import hashlib
 import json
 
 
@@ -149,22 +153,104 @@ def get_user_permissions(user):
     }
 
 
+DASHBOARD_ROLE_EXCLUSIONS = {
+    'supervisor': [1, 2, 4, 5, 6, 8, 9],
+    'admin': [2, 4, 5, 8, 9],
+    'manager': [1, 3, 7, 8],
+}
+DASHBOARD_MENU_CACHE_TIMEOUT = 60 * 60
+DASHBOARD_MENU_ETAG_HEADER = 'X-Dashboard-Menu-ETag'
+
+_DASHBOARD_MENU_VERSION_KEY = 'dashboard_menu:version'
+
+# (version, role) -> (menu, etag); entries from older versions are dropped on bump
+_dashboard_menu_local = {}
+
+
+def dashboard_role(user):
+    """
+    Resolve the dashboard role used to filter menu items
+    """
+    if user.is_supervisor:
+        return 'supervisor'
+    if user.is_admin:
+        return 'admin'
+    if user.is_manager:
+        return 'manager'
+    return 'all'
+
+
+def _build_dashboard_menu(role):
+    from models import DashboardItems
+
+    data = DashboardItems.objects.all().order_by('id')
+    excluded = DASHBOARD_ROLE_EXCLUSIONS.get(role)
+    if excluded:
+        data = data.exclude(id__in=excluded)
+
+    menu = list(data.values())
+    payload = json.dumps(menu, sort_keys=True, cls=DjangoJSONEncoder)
+    etag = '"%s"' % hashlib.md5(payload.encode('utf-8')).hexdigest()
+    return menu, etag
+
+
+def get_dashboard_menu(user):
+    """
+    Return the role-filtered dashboard menu and its ETag.
+
+    The menu is cached per role in process and in Django's cache; both are
+    keyed by a shared version number that invalidate_dashboard_menu() bumps,
+    so every worker picks up edits within VERSION_CHECK_SECONDS.
+    """
+    role = dashboard_role(user)
+    version = current_version(_DASHBOARD_MENU_VERSION_KEY)
+    local_key = (version, role)
+
+    cached = _dashboard_menu_local.get(local_key)
+    if cached is not None:
+        return cached
+
+    cache_key = f'dashboard_menu:{version}:{role}'
+    cached = cache.get(cache_key)
+    if cached is None:
+        cached = _build_dashboard_menu(role)
+        cache.set(cache_key, cached, DASHBOARD_MENU_CACHE_TIMEOUT)
+
+    if any(key[0] != version for key in _dashboard_menu_local):
+        _dashboard_menu_local.clear()
+    _dashboard_menu_local[local_key] = cached
+    return cached
+
+
+def invalidate_dashboard_menu():
+    """
+    Drop every cached dashboard menu
+    """
+    _dashboard_menu_local.clear()
+    bump_version(_DASHBOARD_MENU_VERSION_KEY)
+
+
 def filter_dashboard_items(user):
     """
     Filter dashboard items based on user role
     """
-    from .models import DashboardItems
+    menu, _ = get_dashboard_menu(user)
+    return menu
 
-    data = DashboardItems.objects.all()
 
-    if user.is_supervisor:
-        data = data.exclude(id__in=[1, 2, 4, 5, 6, 8, 9])
-    elif user.is_admin:
-        data = data.exclude(id__in=[2, 4, 5, 8, 9])
-    elif user.is_manager:
-        data = data.exclude(id__in=[1, 3, 7, 8])
+def dashboard_menu_for_request(request):
+    """
+    Dashboard menu to embed in a view response.
+
+    Returns None when the client already holds the current menu, signalled by
+    sending its ETag in the X-Dashboard-Menu-ETag header.
+    """
+    menu, etag = get_dashboard_menu(request.user)
+
+    if request.headers.get(DASHBOARD_MENU_ETAG_HEADER) == etag:
+        return None
 
-    return list(data.values())
+    return menu
 
 
 class APIException(Exception):
@@ -0,0 +1,49 @@
+"""
+Version numbers for caches shared between worker processes.
+
+A cached structure is stored under a key that includes its version, and
+invalidating it bumps the version in Django's cache (see CACHES in
+settings). Each process re-reads a version at most every
+VERSION_CHECK_SECONDS, so a change reaches every worker within that window
+without a cache round trip on every lookup.
+"""
+import time
+from django.core.cache import cache
+
+VERSION_CHECK_SECONDS = 5
+
+# key -> (version, time.monotonic() when it was read)
+_local_versions = {}
+
+
+def _fresh_version():
+    # Never repeats an earlier version, even if the stored one was evicted
+    return time.time_ns()
+
+
+def current_version(key):
+    """The shared version stored under `key`, re-read at most every VERSION_CHECK_SECONDS."""
+    now = time.monotonic()
+    seen = _local_versions.get(key)
+    if seen is not None and now - seen[1] < VERSION_CHECK_SECONDS:
+        return seen[0]
+
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _fresh_version(), None)
+        version = cache.get(key)
+
+    _local_versions[key] = (version, now)
+    return version
+
+
+def bump_version(key):
+    """Move the version under `key` on; this process sees the change at once."""
+    try:
+        version = cache.incr(key)
+    except ValueError:
+        version = _fresh_version()
+        cache.set(key, version, None)
+
+    _local_versions[key] = (version, time.monotonic())
+    return version
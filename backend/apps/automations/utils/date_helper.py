@@ -1,8 +1,47 @@
-from datetime import datetime, date, timedelta
-from dateutil.relativedelta import relativedelta
-from models.location import FrequencySettings
 from datetime import datetime, date
 from typing import Optional, Union
+from django.core.cache import cache
+from models.location import FrequencySettings
+from utils.cache_versions import bump_version, current_version
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+FREQUENCY_CACHE_TIMEOUT = 60 * 60
+FREQUENCY_FALLBACK_DAYS = {
+    "weekly": 7,
+    "bi-monthly": 14,
+    "bi-weekly": 4,
+    "tri-monthly": 10,
+    "monthly": 28
+}
+# Below this many dates the plain loop beats building arrays
+VECTORISE_MIN_DATES = 256
+DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%d/%m/%Y",
+    "%m/%d/%Y",
+    "%Y/%m/%d",
+    "%d-%m-%Y"
+)
+
+# format -> earlier format in DATE_FORMATS that parses the same text differently
+_AMBIGUOUS_WITH = {"%m/%d/%Y": "%d/%m/%Y"}
+
+_FREQUENCY_VERSION_KEY = 'frequency_intervals:version'
+_UNIX_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# version -> {frequency name: interval days}; replaced whenever the version moves on
+_frequency_intervals_local = {}
+# source -> last date format that parsed one of its values
+_last_format_by_source = {}
 
 def get_date_from_string_or_obj(date_input):
     """Convert various date formats to date object."""
@@ -26,47 +65,158 @@ def day(date_str):
     return date_obj.strftime("%A")
 
 
-def calculate_next_due_date(base_date, frequency):
-    """Calculate next service date based on frequency."""
+def get_frequency_intervals():
+    """
+    Return {frequency name: interval days} for every active FrequencySettings row.
 
+    Shared through Django's cache; a change reaches every worker within
+    VERSION_CHECK_SECONDS (see utils.cache_versions).
+    """
+    version = current_version(_FREQUENCY_VERSION_KEY)
 
-    frequency_lower = str(frequency).lower()
+    intervals = _frequency_intervals_local.get(version)
+    if intervals is not None:
+        return intervals
 
-    try:
-        freq_setting = FrequencySettings.objects.get(
-            frequency_name=frequency_lower,
-            is_active=True
-        )
-        delta_days = freq_setting.interval_days
-    except FrequencySettings.DoesNotExist:
-        frequency_fallback = {
-            "weekly": 7,
-            "bi-monthly": 14,
-            "bi-weekly": 4,
-            "tri-monthly": 10,
-            "monthly": 28
+    cache_key = f'frequency_intervals:{version}'
+    intervals = cache.get(cache_key)
+    if intervals is None:
+        intervals = {
+            name.strip().lower(): interval_days
+            for name, interval_days in FrequencySettings.objects.filter(is_active=True).values_list(
+                'frequency_name', 'interval_days'
+            )
         }
-        delta_days = frequency_fallback.get(frequency_lower)
-        if not delta_days:
+        cache.set(cache_key, intervals, FREQUENCY_CACHE_TIMEOUT)
+
+    _frequency_intervals_local.clear()
+    _frequency_intervals_local[version] = intervals
+    return intervals
+
+
+def invalidate_frequency_intervals():
+    """Drop every cached frequency table."""
+    _frequency_intervals_local.clear()
+    bump_version(_FREQUENCY_VERSION_KEY)
+
+
+def frequency_interval_days(frequency, intervals=None):
+    """Days between services for `frequency`, or None if it is unknown."""
+    frequency_lower = str(frequency).strip().lower()
+    if intervals is None:
+        intervals = get_frequency_intervals()
+
+    delta_days = intervals.get(frequency_lower) or FREQUENCY_FALLBACK_DAYS.get(frequency_lower)
+    return delta_days if delta_days and delta_days > 0 else None
+
+
+def _next_due_ordinal(base_ordinal, delta_days, today_ordinal):
+    """First date on or after today reached from base in whole intervals."""
+    if base_ordinal >= today_ordinal:
+        return base_ordinal
+    return base_ordinal - (base_ordinal - today_ordinal) // delta_days * delta_days
+
+
+def calculate_next_due_date(base_date, frequency, today=None):
+    """Calculate next service date based on frequency."""
+    delta_days = frequency_interval_days(frequency)
+    if not delta_days:
+        return None
+
+    today = today or datetime.today().date()
+    return date.fromordinal(_next_due_ordinal(base_date.toordinal(), delta_days, today.toordinal()))
+
+
+def calculate_next_due_dates(base_dates, frequencies, today=None):
+    """
+    Next due dates for parallel sequences of base dates and frequencies.
+
+    Gives None wherever the base date is missing or the frequency unknown.
+    Frequencies are resolved once each; with numpy installed the date
+    arithmetic runs over whole arrays.
+    """
+    today = today or datetime.today().date()
+    today_ordinal = today.toordinal()
+    intervals = get_frequency_intervals()
+
+    deltas = {}
+    base_ordinals = []
+    steps = []
+    for base_date, frequency in zip(base_dates, frequencies):
+        if frequency not in deltas:
+            deltas[frequency] = frequency_interval_days(frequency, intervals) or 0
+        step = deltas[frequency] if base_date else 0
+        base_ordinals.append(base_date.toordinal() if step else today_ordinal)
+        steps.append(step)
+
+    if np is None or len(steps) < VECTORISE_MIN_DATES:
+        return [
+            date.fromordinal(_next_due_ordinal(base, step, today_ordinal)) if step else None
+            for base, step in zip(base_ordinals, steps)
+        ]
+
+    base = np.array(base_ordinals, dtype=np.int64)
+    step = np.array(steps, dtype=np.int64)
+    known = step > 0
+    step_or_one = np.where(known, step, 1)
+    due = np.where(base >= today_ordinal, base, base - (base - today_ordinal) // step_or_one * step_or_one)
+
+    due_dates = (due - _UNIX_EPOCH_ORDINAL).astype('datetime64[D]')
+    due_dates[~known] = np.datetime64('NaT')
+    return due_dates.tolist()
+
+
+def _formats_for(source):
+    """
+    DATE_FORMATS with the last format that worked for `source` tried first.
+
+    A format never jumps ahead of an earlier one that accepts the same
+    values: "05/06/2024" stays 5 June even after the source gave "01/13/2024".
+    """
+    last_format = _last_format_by_source.get(source) if source is not None else None
+    if last_format is None:
+        return DATE_FORMATS
+
+    first = (_AMBIGUOUS_WITH.get(last_format), last_format)
+    return tuple(fmt for fmt in first if fmt) + tuple(fmt for fmt in DATE_FORMATS if fmt not in first)
+
+
+def _parse_iso(text):
+    """date.fromisoformat for YYYY-MM-DD text, else None."""
+    if len(text) == 10 and text[4] == '-' and text[7] == '-':
+        try:
+            return date.fromisoformat(text)
+        except ValueError:
             return None
+    return None
+
 
-    today = datetime.today().date()
-    next_due_date = base_date
-    delta = timedelta(days=delta_days)
+def _parse_date_text(text, source=None):
+    parsed = _parse_iso(text)
+    if parsed is not None:
+        return parsed
 
-    while next_due_date < today:
-        next_due_date += delta
+    for fmt in _formats_for(source):
+        try:
+            parsed = datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+        if source is not None:
+            _last_format_by_source[source] = fmt
+        return parsed
 
-    return next_due_date
+    return None
 
 
-def parse_date(date_input: Union[str, datetime, date, None], default=None) -> Optional[date]:
+def parse_date(date_input: Union[str, datetime, date, None], default=None, source=None) -> Optional[date]:
     """
     Parse various date formats to date object.
 
     Args:
         date_input: String, datetime, or date object
         default: Default value if parsing fails
+        source: Optional key for the column or feed the value comes from;
+            the last format that parsed one of its values is tried first
 
     Returns:
         date object or default value
@@ -74,25 +224,59 @@ def parse_date(date_input: Union[str, datetime, date, None], default=None) -> Op
     if not date_input:
         return default
 
+    if isinstance(date_input, datetime):
+        return date_input.date()
+
     if isinstance(date_input, date):
         return date_input
 
-    if isinstance(date_input, datetime):
-        return date_input.date()
+    parsed = _parse_date_text(str(date_input).strip(), source)
+    return default if parsed is None else parsed
 
-    # Try parsing string formats
-    date_formats = [
-        "%Y-%m-%d",
-        "%d/%m/%Y",
-        "%m/%d/%Y",
-        "%Y/%m/%d",
-        "%d-%m-%Y"
-    ]
 
-    for fmt in date_formats:
-        try:
-            return datetime.strptime(str(date_input).strip(), fmt).date()
-        except ValueError:
-            continue
+def parse_dates(values, default=None, source=None):
+    """
+    Parse a whole column of values, as parse_date() would each one.
+
+    Every distinct value is parsed once. With pandas installed, large
+    columns are parsed one format at a time across all distinct strings.
+    """
+    values = list(values)
+    parsed = {}
+    pending = []
+
+    for value in set(values):
+        if isinstance(value, str) and value:
+            text = value.strip()
+            iso = _parse_iso(text)
+            if iso is not None:
+                parsed[value] = iso
+            else:
+                pending.append((value, text))
+        else:
+            parsed[value] = parse_date(value, default, source)
+
+    if pd is not None and len(pending) >= VECTORISE_MIN_DATES:
+        for fmt in _formats_for(source):
+            if not pending:
+                break
+
+            stamps = pd.to_datetime(pd.Series([text for _, text in pending], dtype=object),
+                                    format=fmt, errors='coerce')
+            remaining = []
+            for (value, text), stamp in zip(pending, stamps):
+                if pd.isna(stamp):
+                    remaining.append((value, text))
+                else:
+                    parsed[value] = stamp.date()
+
+            if len(remaining) < len(pending) and source is not None:
+                _last_format_by_source[source] = fmt
+            pending = remaining
+
+    # Without pandas, or what it could not represent (e.g. years past 2262)
+    for value, text in pending:
+        result = _parse_date_text(text, source)
+        parsed[value] = default if result is None else result
 
-    return default
+    return [parsed[value] for value in values]
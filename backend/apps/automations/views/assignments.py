@@ -0,0 +1,60 @@
+from django.http import JsonResponse
+from django.contrib.auth.decorators import login_required, permission_required
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from services.simulation import simulate_assignments
+from utils.date_helper import parse_date
+import json
+
+
+@require_POST
+@csrf_exempt
+@login_required
+@permission_required("admindash.is_admin_member", raise_exception=True)
+def simulate(request):
+    """Dry-run the daily assignment for a date range with hypothetical leave and vehicle outages."""
+    try:
+        data = json.loads(request.body or "{}")
+    except json.JSONDecodeError:
+        return JsonResponse({"success": False, "error": "Invalid JSON"}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({"success": False, "error": "Expected a JSON object."}, status=400)
+
+    start_date = parse_date(data.get("start_date"))
+    if start_date is None:
+        return JsonResponse({"success": False, "error": "A valid start_date is required."}, status=400)
+    end_date = parse_date(data.get("end_date")) if data.get("end_date") else start_date
+    if end_date is None:
+        return JsonResponse({"success": False, "error": "end_date is not a valid date."}, status=400)
+
+    staff_on_leave = data.get("staff_on_leave", [])
+    if isinstance(staff_on_leave, dict):
+        leave_by_date = {}
+        for day, usernames in staff_on_leave.items():
+            leave_date = parse_date(day)
+            if leave_date is None:
+                return JsonResponse({
+                    "success": False, "error": f"staff_on_leave has an invalid date: {day!r}"
+                }, status=400)
+            leave_by_date[leave_date] = usernames
+        staff_on_leave = leave_by_date
+
+    seed = data.get("seed", 0)
+    if isinstance(seed, bool) or not isinstance(seed, int):
+        return JsonResponse({"success": False, "error": "seed must be an integer."}, status=400)
+
+    try:
+        result = simulate_assignments(
+            start_date,
+            end_date,
+            staff_on_leave=staff_on_leave,
+            vehicles_out=data.get("vehicles_out", []),
+            allocation_engine=data.get("allocation_engine"),
+            team_strategy=data.get("team_strategy", "greedy"),
+            seed=seed,
+            include_vehicles=data.get("include_vehicles", True),
+        )
+    except ValueError as e:
+        return JsonResponse({"success": False, "error": str(e)}, status=400)
+
+    return JsonResponse({"success": True, "simulation": result})
@@ -3,7 +3,7 @@ from django.contrib.auth.decorators import login_required, permission_required
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 from models.location import Branches
-from models import DashboardItems
+from utils.api_utils import dashboard_menu_for_request
 from admindash.services.data_loaders.file_processor import BranchFileProcessor
 import json
 
@@ -12,16 +12,7 @@ import json
 @permission_required("admindash.is_admin_member", raise_exception=True)
 def show_branches(request):
     """List all branches."""
-    data = DashboardItems.objects.all()
-
-    if request.user.is_supervisor:
-        data = data.exclude(id__in=[1, 2, 4, 5, 6, 8, 9])
-    elif request.user.is_admin:
-        data = data.exclude(id__in=[2, 4, 5, 8, 9])
-    elif request.user.is_manager:
-        data = data.exclude(id__in=[1, 3, 7, 8])
-
-    data_list = list(data.values())
+    data_list = dashboard_menu_for_request(request)
     branches = list(Branches.objects.all().values())
 
     return JsonResponse({
@@ -2,7 +2,8 @@ from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required, permission_required
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
-from models import Notification, DashboardItems
+from models import Notification
+from utils.api_utils import dashboard_menu_for_request
 from admindash.services.notifications.email import EmailService
 from admindash.services.notifications.sms import SMSService
 from django.core.paginator import Paginator
@@ -12,16 +13,7 @@ import json
 @login_required
 def notifications(request):
     """Get user notifications with pagination."""
-    # Role-based dashboard filtering
-    data = DashboardItems.objects.all()
-    if request.user.is_supervisor:
-        data = data.exclude(id__in=[1, 2, 4, 5, 6, 8, 9])
-    elif request.user.is_admin:
-        data = data.exclude(id__in=[2, 4, 5, 8, 9])
-    elif request.user.is_manager:
-        data = data.exclude(id__in=[1, 3, 7, 8])
-
-    data_list = list(data.values())
+    data_list = dashboard_menu_for_request(request)
 
     # Get notifications for current user
     user_notifications = Notification.objects.filter(
@@ -1,16 +1,19 @@
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required, permission_required
 from django.contrib.auth import get_user_model
 from models import (
     Clients, VehicleRoute, Task,
-    DashboardItems, WeeklySchedule, Vehicles
+    WeeklySchedule, Vehicles
 )
-from utils.date_helper import parse_date
+from utils.api_utils import dashboard_menu_for_request
+from utils.date_helper import parse_date, parse_dates
+from services.reports import staff_task_counts, vehicle_route_counts
 from django.db.models import Count, Q, Avg
 from collections import defaultdict
 from datetime import datetime, timedelta
 import csv
 import json
+import zlib
 
 User = get_user_model()
 
@@ -19,16 +22,7 @@ User = get_user_model()
 @permission_required("admindash.is_admin_member", raise_exception=True)
 def active_contracts_report(request):
     """Generate active contracts report."""
-    # Role-based dashboard filtering
-    data = DashboardItems.objects.all()
-    if request.user.is_supervisor:
-        data = data.exclude(id__in=[1, 2, 4, 5, 6, 8, 9])
-    elif request.user.is_admin:
-        data = data.exclude(id__in=[2, 4, 5, 8, 9])
-    elif request.user.is_manager:
-        data = data.exclude(id__in=[1, 3, 7, 8])
-
-    data_list = list(data.values())
+    data_list = dashboard_menu_for_request(request)
 
     # Get filter parameters
     region = request.GET.get('region', '')
@@ -122,16 +116,7 @@ def active_contracts_report(request):
 @permission_required("admindash.is_admin_member", raise_exception=True)
 def task_report(request):
     """Generate task completion and performance report."""
-    # Role-based dashboard filtering
-    data = DashboardItems.objects.all()
-    if request.user.is_supervisor:
-        data = data.exclude(id__in=[1, 2, 4, 5, 6, 8, 9])
-    elif request.user.is_admin:
-        data = data.exclude(id__in=[2, 4, 5, 8, 9])
-    elif request.user.is_manager:
-        data = data.exclude(id__in=[1, 3, 7, 8])
-
-    data_list = list(data.values())
+    data_list = dashboard_menu_for_request(request)
 
     # Get filter parameters
     start_date = request.GET.get('start_date')
@@ -175,9 +160,12 @@ def task_report(request):
     total_tasks = len(tasks)
     completed_tasks = sum(1 for t in tasks if t.get("status", "").lower() == "completed")
     pending_tasks = sum(1 for t in tasks if t.get("status", "").lower() == "pending")
+    today = datetime.now().date()
+    # One pass over the column; unparseable or missing due dates are never overdue
+    due_dates = parse_dates((t["due_date"] for t in tasks), source=("task_report", "due_date"))
     overdue_tasks = sum(
-        1 for t in tasks
-        if t.get("due_date") and parse_date(t["due_date"]) < datetime.now().date()
+        1 for t, due_date in zip(tasks, due_dates)
+        if due_date is not None and due_date < today
         and t.get("status", "").lower() != "completed"
     )
 
@@ -220,16 +208,7 @@ def task_report(request):
 @permission_required("admindash.is_admin_member", raise_exception=True)
 def weekly_schedule_report(request):
     """Generate weekly schedule report."""
-    # Role-based dashboard filtering
-    data = DashboardItems.objects.all()
-    if request.user.is_supervisor:
-        data = data.exclude(id__in=[1, 2, 4, 5, 6, 8, 9])
-    elif request.user.is_admin:
-        data = data.exclude(id__in=[2, 4, 5, 8, 9])
-    elif request.user.is_manager:
-        data = data.exclude(id__in=[1, 3, 7, 8])
-
-    data_list = list(data.values())
+    data_list = dashboard_menu_for_request(request)
 
     # Get filter parameters
     week_start = request.GET.get('week_start')
@@ -308,16 +287,7 @@ def weekly_schedule_report(request):
 @permission_required("admindash.is_admin_member", raise_exception=True)
 def staff_report(request):
     """Generate staff performance and workload report."""
-    # Role-based dashboard filtering
-    data = DashboardItems.objects.all()
-    if request.user.is_supervisor:
-        data = data.exclude(id__in=[1, 2, 4, 5, 6, 8, 9])
-    elif request.user.is_admin:
-        data = data.exclude(id__in=[2, 4, 5, 8, 9])
-    elif request.user.is_manager:
-        data = data.exclude(id__in=[1, 3, 7, 8])
-
-    data_list = list(data.values())
+    data_list = dashboard_menu_for_request(request)
 
     # Get all non-admin staff
     staff_query = User.objects.filter(is_staff=True).exclude(
@@ -336,26 +306,20 @@ def staff_report(request):
     if specialization:
         staff_query = staff_query.filter(specialization__icontains=specialization)
 
+    # Task and schedule statistics for every staff member in grouped queries
+    staff_stats = staff_task_counts(staff_query.values('username'))
+
     # Generate staff report
     staff_data = []
     for staff in staff_query:
-        # Get task statistics
-        total_tasks = Task.objects.filter(staff_assigned=staff.username).count()
-        completed_tasks = Task.objects.filter(
-            staff_assigned=staff.username,
-            status__iexact="completed"
-        ).count()
-        pending_tasks = Task.objects.filter(
-            staff_assigned=staff.username,
-            status__iexact="pending"
-        ).count()
+        stats = staff_stats[staff.username]
+        total_tasks = stats['total']
+        completed_tasks = stats['completed']
+        pending_tasks = stats['pending']
 
         completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
 
-        # Get scheduled routes
-        scheduled_routes = WeeklySchedule.objects.filter(
-            staff_assigned=staff.username
-        ).count()
+        scheduled_routes = stats['scheduled']
 
         staff_data.append({
             "id": staff.id,
@@ -412,37 +376,29 @@ def staff_report(request):
 @permission_required("admindash.is_admin_member", raise_exception=True)
 def vehicle_utilization_report(request):
     """Generate vehicle utilization report."""
-    # Role-based dashboard filtering
-    data = DashboardItems.objects.all()
-    if request.user.is_supervisor:
-        data = data.exclude(id__in=[1, 2, 4, 5, 6, 8, 9])
-    elif request.user.is_admin:
-        data = data.exclude(id__in=[2, 4, 5, 8, 9])
-    elif request.user.is_manager:
-        data = data.exclude(id__in=[1, 3, 7, 8])
+    data_list = dashboard_menu_for_request(request)
+
+    # Optional assignment window
+    start_date = request.GET.get('start_date')
+    end_date = request.GET.get('end_date')
+    start = parse_date(start_date) if start_date else None
+    end = parse_date(end_date) if end_date else None
 
-    data_list = list(data.values())
+    # Route statistics for the whole fleet in one grouped query
+    route_stats = vehicle_route_counts(start, end)
 
     # Get all vehicles
     vehicles = Vehicles.objects.all()
 
     vehicle_data = []
     for vehicle in vehicles:
-        # Get route assignments
-        total_assignments = VehicleRoute.objects.filter(plate=vehicle.vehicle_name).count()
-
-        # Get unique routes covered
-        unique_routes = VehicleRoute.objects.filter(
-            plate=vehicle.vehicle_name
-        ).values_list('route', flat=True).distinct().count()
-
-        # Get total clients served
-        total_clients = VehicleRoute.objects.filter(
-            plate=vehicle.vehicle_name
-        ).aggregate(total=Count('clients'))['total'] or 0
+        stats = route_stats[vehicle.vehicle_name]
+        total_assignments = stats['total_assignments']
+        unique_routes = stats['unique_routes']
+        total_clients = stats['total_clients']
 
         # Calculate utilization rate (assignments vs capacity)
-        utilization_rate = (total_clients / vehicle.capacity * 100) if vehicle.capacity > 0 else 0
+        utilization_rate = (total_clients / vehicle.capacity * 100) if vehicle.capacity else 0
 
         vehicle_data.append({
             "id": vehicle.id,
@@ -471,95 +427,170 @@ def vehicle_utilization_report(request):
                 "total_vehicles": total_vehicles,
                 "available_vehicles": available_vehicles,
                 "avg_utilization_rate": round(avg_utilization, 2)
+            },
+            "filters": {
+                "start_date": start_date,
+                "end_date": end_date
             }
         }
     })
 
 
-@login_required
-@permission_required("admindash.is_admin_member", raise_exception=True)
-def export_report_csv(request):
-    """Export report data to CSV."""
-    report_type = request.GET.get('type', 'contracts')
+EXPORT_CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """File-like object whose write() hands the value back, for csv.writer streaming."""
+
+    def write(self, value):
+        return value
+
+
+def _iter_values_list(queryset, fields, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield values_list rows in primary-key order, one bounded query per chunk.
+
+    The MySQL drivers buffer the whole result set even under iterator(), so
+    keyset paging on the primary key is what keeps memory flat.
+    """
+    queryset = queryset.order_by('pk')
+    last_pk = 0
+
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk).values_list('pk', *fields)[:chunk_size])
+        if not batch:
+            return
+
+        for row in batch:
+            yield row[1:]
+
+        last_pk = batch[-1][0]
+
 
-    # Create CSV response
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="{report_type}_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv"'
+def _csv_lines(header, rows, chunk_size=EXPORT_CHUNK_SIZE):
+    """Render rows as CSV text, yielding one block of lines per chunk."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
 
-    writer = csv.writer(response)
+    block = []
+    for row in rows:
+        block.append(writer.writerow(row))
+        if len(block) >= chunk_size:
+            yield ''.join(block)
+            block = []
 
-    if report_type == 'contracts':
-        # Export contracts
-        writer.writerow([
+    if block:
+        yield ''.join(block)
+
+
+def _gzip_stream(chunks):
+    """Compress text chunks into a gzip byte stream on the fly."""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+
+    yield compressor.flush()
+
+
+def _contract_export_rows():
+    today = datetime.now().date()
+    fields = (
+        'company_name', 'email', 'contact_phone', 'branch_asoc', 'frequency',
+        'quantity', 'contract_start_date', 'contract_end_date'
+    )
+
+    for row in _iter_values_list(Clients.objects.all(), fields):
+        status = "Expired" if row[-1] and row[-1] < today else "Active"
+        yield (*row, status)
+
+
+def _task_export_rows():
+    fields = (
+        'client_assigned', 'staff_assigned', 'due_date',
+        'last_service_date', 'status', 'created_at'
+    )
+    return _iter_values_list(Task.objects.all(), fields)
+
+
+def _staff_export_rows():
+    staff = User.objects.filter(is_staff=True).exclude(is_superuser=True)
+    staff_stats = staff_task_counts(staff.values('username'))
+
+    for member in staff.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        total_tasks = staff_stats[member.username]['total']
+        completed_tasks = staff_stats[member.username]['completed']
+        completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
+
+        yield [
+            member.username,
+            member.email,
+            getattr(member, 'phone', ''),
+            getattr(member, 'region', ''),
+            getattr(member, 'specialization', ''),
+            total_tasks,
+            completed_tasks,
+            f"{completion_rate:.2f}%",
+            "Active" if member.is_active else "Inactive"
+        ]
+
+
+EXPORT_REPORTS = {
+    'contracts': (
+        [
             'Client Name', 'Email', 'Phone', 'Branch', 'Frequency',
             'Quantity', 'Contract Start', 'Contract End', 'Status'
-        ])
-
-        clients = Clients.objects.all()
-        today = datetime.now().date()
-
-        for client in clients:
-            status = "Active"
-            if client.contract_end_date and client.contract_end_date < today:
-                status = "Expired"
-
-            writer.writerow([
-                client.client_name,
-                client.email,
-                client.contact_phone,
-                client.branch_asoc,
-                client.billing_freq,
-                client.quantity,
-                client.contract_start_date,
-                client.contract_end_date,
-                status
-            ])
-
-    elif report_type == 'tasks':
-        # Export tasks
-        writer.writerow([
+        ],
+        _contract_export_rows,
+    ),
+    'tasks': (
+        [
             'Client Name', 'Staff Assigned', 'Due Date',
             'Last Service Date', 'Status', 'Created At'
-        ])
-
-        tasks = Task.objects.all()
-        for task in tasks:
-            writer.writerow([
-                task.client_name,
-                task.staff_assigned,
-                task.due_date,
-                task.last_service_date,
-                task.status,
-                task.created_at
-            ])
-
-    elif report_type == 'staff':
-        # Export staff
-        writer.writerow([
+        ],
+        _task_export_rows,
+    ),
+    'staff': (
+        [
             'Username', 'Email', 'Phone', 'Region',
             'Specialization', 'Total Tasks', 'Completed Tasks',
             'Completion Rate', 'Status'
-        ])
-
-        staff = User.objects.filter(is_staff=True).exclude(is_superuser=True)
-        for member in staff:
-            total_tasks = Task.objects.filter(staff_assigned=member.username).count()
-            completed_tasks = Task.objects.filter(
-                staff_assigned=member.username,
-                status__iexact="completed"
-            ).count()
-            completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-
-            writer.writerow([
-                member.username,
-                member.email,
-                getattr(member, 'phone', ''),
-                getattr(member, 'region', ''),
-                getattr(member, 'specialization', ''),
-                total_tasks,
-                completed_tasks,
-                f"{completion_rate:.2f}%",
-                "Active" if member.is_active else "Inactive"
-            ])
+        ],
+        _staff_export_rows,
+    ),
+}
+
+
+@login_required
+@permission_required("admindash.is_admin_member", raise_exception=True)
+def export_report_csv(request):
+    """
+    Stream report data as CSV.
+
+    Rows are fetched in bounded chunks and written out as they are read, so
+    memory stays flat regardless of table size. Pass `?gzip=1` to receive a
+    gzip-compressed `.csv.gz` download instead.
+    """
+    report_type = request.GET.get('type', 'contracts')
+    use_gzip = request.GET.get('gzip', '').lower() in ('1', 'true', 'yes')
+
+    if report_type not in EXPORT_REPORTS:
+        return JsonResponse({
+            "success": False,
+            "error": f"Unknown report type: {report_type}"
+        }, status=400)
+
+    header, row_source = EXPORT_REPORTS[report_type]
+    chunks = _csv_lines(header, row_source())
+    filename = f'{report_type}_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+
+    if use_gzip:
+        response = StreamingHttpResponse(_gzip_stream(chunks), content_type='application/gzip')
+        filename += '.gz'
+    else:
+        response = StreamingHttpResponse(chunks, content_type='text/csv')
 
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
     return response
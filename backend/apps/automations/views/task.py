@@ -3,11 +3,13 @@ from django.contrib.auth.decorators import login_required, permission_required
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 from django.contrib.auth import get_user_model
-from models import Task, Clients, DashboardItems, TODOReassignments
+from models import Task, Clients, TODOReassignments
+from utils.api_utils import dashboard_menu_for_request
 from admindash.services.notifications.email import EmailService
 from admindash.services.notifications.sms import SMSService
 from utils.validators import validate_required_fields
 from utils.date_helper import parse_date
+from datetime import date
 import json
 import threading
 
@@ -19,16 +21,7 @@ User = get_user_model()
 def show_tasks(request):
     """List all tasks."""
     if request.method == "GET":
-        data = DashboardItems.objects.all()
-
-        if request.user.is_supervisor:
-            data = data.exclude(id__in=[1, 2, 4, 5, 6, 8, 9])
-        elif request.user.is_admin:
-            data = data.exclude(id__in=[2, 4, 5, 8, 9])
-        elif request.user.is_manager:
-            data = data.exclude(id__in=[1, 3, 7, 8])
-
-        data_list = list(data.values())
+        data_list = dashboard_menu_for_request(request)
         users = list(User.objects.all().values())
         tasks = list(Task.objects.all().order_by("-created_at").values())
         clients = list(Clients.objects.all().values())
@@ -69,6 +62,14 @@ def assign_task(request):
                     "error": error
                 }, status=400)
 
+            due_date = parse_date(data["due_date"])
+            last_service_date = parse_date(data.get("last_service_date"))
+            if due_date is None or (data.get("last_service_date") and last_service_date is None):
+                return JsonResponse({
+                    "success": False,
+                    "error": "Invalid date"
+                }, status=400)
+
             # Get staff and client
             staff = User.objects.get(username=data["username"])
             client = Clients.objects.get(id=data["client_id"])
@@ -80,8 +81,8 @@ def assign_task(request):
                 description=data["description"],
                 status=data["status"],
                 priority=data.get("priority", "Medium"),
-                due_date=data["due_date"],
-                last_service_date=data.get("last_service_date")
+                due_date=due_date,
+                last_service_date=last_service_date
             )
 
             # Send notifications in background
@@ -192,11 +193,21 @@ def edit_task(request, task_id):
         last_service_date_str = data.get("last_service_date")
         if last_service_date_str:
             task.last_service_date = parse_date(last_service_date_str)
+            if task.last_service_date is None:
+                return JsonResponse({
+                    "success": False,
+                    "error": "Invalid last_service_date"
+                }, status=400)
 
         # Handle due_date
         due_date_str = data.get("due_date")
         if due_date_str:
             task.due_date = parse_date(due_date_str)
+            if task.due_date is None:
+                return JsonResponse({
+                    "success": False,
+                    "error": "Invalid due_date"
+                }, status=400)
 
         task.save()
 
@@ -238,7 +249,8 @@ def _notify_task_changes(task, initial_staff_assigned):
         # Store reassignment for future use
         lookup_fields = {
             'client_assigned': task.client_assigned,
-            'reassigned_date': task.revised_date,
+            # reassigned_date cannot be NULL; without a revised date the reassignment is dated today
+            'reassigned_date': task.revised_date or date.today(),
         }
         defaults = {
             'staff_assigned': task.staff_assigned,
@@ -271,15 +283,7 @@ def task_approval(request):
             Task.objects.exclude(status="Completed").order_by("-created_at").values()
         )
 
-        data = DashboardItems.objects.all()
-        if request.user.is_supervisor:
-            data = data.exclude(id__in=[1, 2, 4, 5, 6, 8, 9])
-        elif request.user.is_admin:
-            data = data.exclude(id__in=[2, 4, 5, 8, 9])
-        elif request.user.is_manager:
-            data = data.exclude(id__in=[1, 3, 7, 8])
-
-        data_list = list(data.values())
+        data_list = dashboard_menu_for_request(request)
 
         return JsonResponse(
             {
@@ -2,7 +2,8 @@ from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required, permission_required
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
-from models import Vehicles, DashboardItems
+from models import Vehicles
+from utils.api_utils import dashboard_menu_for_request
 from models.location import Branches
 from admindash.services.data_loaders.file_processor import VehicleFileProcessor
 import json
@@ -12,16 +13,7 @@ import json
 @permission_required("admindash.is_admin_member", raise_exception=True)
 def show_vehicles(request):
     """List all vehicles."""
-    data = DashboardItems.objects.all()
-
-    if request.user.is_supervisor:
-        data = data.exclude(id__in=[1, 2, 4, 5, 6, 8, 9])
-    elif request.user.is_admin:
-        data = data.exclude(id__in=[2, 4, 5, 8, 9])
-    elif request.user.is_manager:
-        data = data.exclude(id__in=[1, 3, 7, 8])
-
-    data_list = list(data.values())
+    data_list = dashboard_menu_for_request(request)
 
     vehicles = list(Vehicles.objects.all().values(
         'id', 'vehicle_name', 'capacity', 'region', 'is_available',
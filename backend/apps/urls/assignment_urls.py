@@ -0,0 +1,9 @@
+"""
+URL patterns for assignment planning views.
+"""
+from django.urls import path
+from automations.views import assignments
+
+urlpatterns = [
+    path('simulate/', assignments.simulate, name='simulate_assignments'),
+]
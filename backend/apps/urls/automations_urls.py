@@ -7,6 +7,9 @@ from django.urls import path, include
 app_name = 'automations'
 
 urlpatterns = [
+    # Assignments
+    path('assignments/', include('urls.assignment_urls')),
+
     # Dashboard
     path('dashboard/', include('urls.dashboard_urls')),
 
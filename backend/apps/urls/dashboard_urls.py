@@ -6,5 +6,6 @@ from automations.views import dashboard
 
 urlpatterns = [
     path('admin/', dashboard.admin, name='admin_dashboard'),
+    path('menu/', dashboard.menu, name='dashboard_menu'),
 ]
 